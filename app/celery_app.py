@@ -45,6 +45,8 @@ celery_app.conf.update(
     # 任务重试
     task_acks_late=True,
     task_reject_on_worker_lost=True,
+    # 每个Worker进程只预取一个任务，避免长任务阻塞已预取到本地的短任务
+    worker_prefetch_multiplier=1,
     # 定时任务配置
     beat_schedule={
         "system-health-check-every-hour": {
@@ -69,9 +71,26 @@ celery_app.conf.update(
         ),
         Queue("default", Exchange("default"), routing_key="default.*"),
         Queue("low_priority", Exchange("low_priority"), routing_key="low_priority.*"),
+        # 非持久化队列：通知类消息允许丢失，不写盘、不确认
+        Queue(
+            "status",
+            Exchange("status", delivery_mode=1),
+            routing_key="status.*",
+            durable=False,
+            no_ack=True,
+        ),
     ),
     # 任务路由
     task_routes={
+        # 通知任务（需在common_tasks通配规则之前）
+        "app.tasks.common_tasks.send_notification": {
+            "queue": "status",
+            "routing_key": "status.notification",
+        },
+        "app.tasks.common_tasks.send_notifications_bulk": {
+            "queue": "status",
+            "routing_key": "status.notification",
+        },
         # 高优先级任务
         "app.tasks.high_priority_tasks.*": {
             "queue": "high_priority",
@@ -66,6 +66,9 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
     REDIS_DB: int = 0
+    # 缓存Redis连接池大小（每个进程），连接用尽时等待REDIS_POOL_TIMEOUT秒
+    REDIS_POOL_SIZE: int = 50
+    REDIS_POOL_TIMEOUT: float = 1.0
 
     @property
     def REDIS_URI(self) -> str:
@@ -155,6 +158,12 @@ class Settings(BaseSettings):
     # 线程池设置
     WORKER_POOL_SIZE: int = 4
 
+    # Uvicorn工作进程数，未设置时按物理核心数计算（见run.py）
+    UVICORN_WORKERS: Optional[int] = None
+
+    # 模型部署/验证任务是否模拟各阶段的处理耗时（生产环境应关闭）
+    SIMULATE_STAGES: bool = True
+
     # Pydantic设置
     model_config = SettingsConfigDict(
         env_file=".env",
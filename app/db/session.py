@@ -38,9 +38,9 @@ if "sqlite" not in engine_url:
     # 非SQLite数据库（如MySQL、PostgreSQL）支持连接池参数
     engine_kwargs.update({
         "pool_pre_ping": True,
-        "pool_recycle": 3600,
+        "pool_recycle": 1800,  # 早于数据库端空闲超时回收连接
         "pool_size": 20,  # 增加连接池大小
-        "max_overflow": 30,  # 允许最大溢出连接数
+        "max_overflow": 10,  # 允许最大溢出连接数
         "pool_timeout": 30,  # 连接获取超时时间
         "pool_use_lifo": True,  # 使用LIFO策略提高缓存利用率
     })
@@ -75,8 +75,8 @@ sync_engine_kwargs = {
 if "sqlite" not in settings.SQLALCHEMY_DATABASE_URI:
     sync_engine_kwargs.update({
         "pool_pre_ping": True,
-        "pool_recycle": 3600,
-        "pool_size": 5,  # 同步操作使用较小的连接池
+        "pool_recycle": 1800,
+        "pool_size": 20,  # Worker进程复用同步连接，与异步引擎保持相同规模
         "max_overflow": 10,
         "pool_timeout": 30,
     })
@@ -99,6 +99,10 @@ sync_session_maker = sessionmaker(
     autoflush=False,
 )
 
+# 会话工厂别名，供Celery任务等模块使用
+async_session = async_session_maker
+SessionLocal = sync_session_maker
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -12,6 +12,7 @@ import logging
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -55,6 +56,8 @@ def create_application() -> FastAPI:
         redoc_url="/redoc",
         openapi_url=f"{settings.API_PREFIX}/openapi.json",
         debug=settings.APP_DEBUG,
+        # API数据使用orjson序列化，页面由前端通过API加载数据后渲染
+        default_response_class=ORJSONResponse,
     )
 
     # 配置指标收集
@@ -94,6 +97,11 @@ def create_application() -> FastAPI:
         except Exception as e:
             logging.error(f"缓存系统初始化失败: {str(e)}")
 
+        # 预编译Web模板
+        from app.web.routes import warm_templates
+
+        logging.info(f"已预编译 {warm_templates()} 个模板")
+
         # 初始化任务系统
         init_task_system()
 
@@ -102,6 +110,11 @@ def create_application() -> FastAPI:
         """应用关闭时执行的事件处理函数"""
         logging.info("Shutting down application")
         await close_db_connection(app)
+
+        # 关闭缓存使用的Redis连接池
+        from app.utils.dependencies import close_redis_pool
+
+        await close_redis_pool()
         shutdown_task_system()
 
     return app
@@ -16,7 +16,7 @@ import time
 from typing import List, Optional, Union, Dict, Any, BinaryIO, Tuple
 
 from fastapi import UploadFile
-from sqlalchemy import select, func, or_, desc
+from sqlalchemy import select, func, or_, desc, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -243,6 +243,30 @@ class ModelService(CRUDBase[Model, ModelCreate, ModelUpdate]):
 
         return model
 
+    async def update_model(
+        self, db: AsyncSession, *, model_id: str, **fields: Any
+    ) -> bool:
+        """
+        更新模型字段
+
+        以单条UPDATE语句更新指定字段，不需要先查询模型对象，
+        状态和其他字段在同一次往返中写入。
+
+        参数:
+            db: 数据库会话
+            model_id: 模型ID
+            **fields: 要更新的字段，如status、endpoint_url、accuracy
+
+        返回:
+            bool: 模型是否存在并已更新
+        """
+        result = await db.execute(
+            update(Model).where(Model.id == model_id).values(**fields)
+        )
+        await db.commit()
+
+        return result.rowcount > 0
+
     async def upload_model_file(
         self, db: AsyncSession, *, model_id: str, file: UploadFile
     ) -> Optional[Model]:
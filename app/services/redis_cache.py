@@ -173,16 +173,8 @@ class RedisCacheService:
             return False
 
         try:
-            # 将值转换为字符串
-            string_mapping = {}
-            for field, value in mapping.items():
-                if isinstance(value, (dict, list)):
-                    string_mapping[field] = json.dumps(value)
-                else:
-                    string_mapping[field] = str(value) if value is not None else ""
-
             # 设置哈希缓存
-            self._redis_client.hset(key, mapping=string_mapping)
+            self._redis_client.hset(key, mapping=self._to_string_mapping(mapping))
 
             # 设置过期时间
             if expiry > 0:
@@ -193,6 +185,25 @@ class RedisCacheService:
             logger.error(f"设置哈希缓存失败 [{key}]: {e}")
             return False
 
+    @staticmethod
+    def _to_string_mapping(mapping: Dict[str, Any]) -> Dict[str, str]:
+        """
+        将哈希字段值转换为字符串
+
+        参数:
+            mapping: 字段到值的映射
+
+        返回:
+            Dict[str, str]: 字典和列表序列化为JSON，None转换为空字符串
+        """
+        string_mapping = {}
+        for field, value in mapping.items():
+            if isinstance(value, (dict, list)):
+                string_mapping[field] = json.dumps(value)
+            else:
+                string_mapping[field] = str(value) if value is not None else ""
+        return string_mapping
+
     def hgetall(
         self, key: str, parse_json: List[str] = None
     ) -> Optional[Dict[str, Any]]:
@@ -303,6 +314,36 @@ class RedisCacheService:
         key = f"task:{task_id}:status"
         return self.hmset(key, status, TASK_STATUS_EXPIRY)
 
+    def cache_task_status_bulk(self, items: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        批量缓存任务状态
+
+        使用非事务管道将多个任务的状态写入合并为一次网络往返。
+
+        参数:
+            items: 任务ID到任务状态信息的映射
+
+        返回:
+            bool: 操作是否成功
+        """
+        if not items:
+            return True
+
+        if not self._ensure_connection():
+            return False
+
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for task_id, status in items.items():
+                key = f"task:{task_id}:status"
+                pipe.hset(key, mapping=self._to_string_mapping(status))
+                pipe.expire(key, TASK_STATUS_EXPIRY)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"批量缓存任务状态失败: {e}")
+            return False
+
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         获取任务状态缓存
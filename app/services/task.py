@@ -12,8 +12,9 @@ import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Union, Tuple
 
-from sqlalchemy import desc, and_, or_, func
+from sqlalchemy import JSON, bindparam, desc, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from sqlalchemy.future import select
 
 from app.core.celery import CeleryHelper
@@ -292,6 +293,138 @@ class TaskService(CRUDBase):
 
         return task
 
+    async def bulk_update_task_status(
+        self, db: AsyncSession, updates: List[Dict[str, Any]]
+    ) -> int:
+        """
+        批量更新任务状态
+
+        使用单条UPDATE语句的executemany一次性写入多个任务的状态、进度和结果，
+        将N次往返合并为一次。值为None的字段保持数据库中的原值。
+        不刷新缓存，由调用方负责。
+
+        参数:
+            db: 数据库会话
+            updates: 更新列表，每项包含task_id、status，以及可选的progress、result、error
+
+        返回:
+            int: 提交的更新条数
+        """
+        if not updates:
+            return 0
+
+        stmt, params = self._build_status_update(updates)
+        await db.execute(stmt, params)
+        await db.commit()
+
+        return len(params)
+
+    def update_task_status_sync(
+        self,
+        db: Session,
+        task_id: Union[str, uuid.UUID],
+        status: TaskStatus,
+        progress: Optional[int] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """
+        同步更新任务状态
+
+        使用同步会话执行单条UPDATE，不需要事件循环，供Celery任务等同步代码直接调用。
+        值为None的字段保持数据库中的原值。不刷新缓存，由调用方负责。
+
+        参数:
+            db: 同步数据库会话
+            task_id: 任务ID
+            status: 新的任务状态
+            progress: 任务进度（0-100）
+            result: 任务结果数据
+            error: 任务错误信息
+
+        返回:
+            bool: 任务是否存在并已更新
+        """
+        stmt, params = self._build_status_update(
+            [
+                {
+                    "task_id": task_id,
+                    "status": status,
+                    "progress": progress,
+                    "result": result,
+                    "error": error,
+                }
+            ]
+        )
+        updated = db.execute(stmt, params[0]).rowcount
+        db.commit()
+
+        return updated > 0
+
+    @staticmethod
+    def _build_status_update(
+        updates: List[Dict[str, Any]]
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        构建任务状态更新语句和参数
+
+        参数:
+            updates: 更新列表，每项包含task_id、status，以及可选的progress、result、error
+
+        返回:
+            Tuple[Any, List[Dict[str, Any]]]: UPDATE语句和对应的参数列表
+        """
+        table = Task.__table__
+        now = datetime.utcnow()
+        terminal_statuses = (TaskStatus.SUCCEEDED, TaskStatus.FAILED, TaskStatus.REVOKED)
+
+        # None需要绑定为SQL NULL（而不是JSON的null），COALESCE才能保留原值
+        stmt = (
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                status=bindparam("b_status", type_=table.c.status.type),
+                progress=func.coalesce(
+                    bindparam("b_progress", type_=table.c.progress.type),
+                    table.c.progress,
+                ),
+                result=func.coalesce(
+                    bindparam("b_result", type_=JSON(none_as_null=True)),
+                    table.c.result,
+                ),
+                error=func.coalesce(
+                    bindparam("b_error", type_=table.c.error.type), table.c.error
+                ),
+                started_at=func.coalesce(
+                    table.c.started_at,
+                    bindparam("b_started_at", type_=table.c.started_at.type),
+                ),
+                completed_at=func.coalesce(
+                    table.c.completed_at,
+                    bindparam("b_completed_at", type_=table.c.completed_at.type),
+                ),
+            )
+        )
+
+        # 按任务ID排序（稳定排序保留同一任务的更新顺序），多个进程并发批量更新时
+        # 以相同顺序获取行锁，避免相互等待或死锁
+        params = []
+        for update in sorted(updates, key=lambda u: str(u["task_id"])):
+            status = update["status"]
+            params.append(
+                {
+                    "b_id": str(update["task_id"]),
+                    "b_status": status,
+                    "b_progress": update.get("progress"),
+                    "b_result": update.get("result"),
+                    "b_error": update.get("error"),
+                    "b_started_at": now if status == TaskStatus.RUNNING else None,
+                    "b_completed_at": now if status in terminal_statuses else None,
+                }
+            )
+
+        return stmt, params
+
     async def cancel_task(self, db: AsyncSession, task_id: uuid.UUID) -> bool:
         """
         取消任务
@@ -230,12 +230,18 @@ class SimplifiedAPI(http.server.SimpleHTTPRequestHandler):
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
             tables = [row["name"] for row in cursor.fetchall()]
 
-            # 获取每个表的行数
+            # 获取每个表的行数：标识符加引号转义，合并为一条UNION ALL语句，
+            # 只需准备一次语句，避免逐表拼接SQL
             table_counts = {}
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) as count FROM {table};")
-                count = cursor.fetchone()["count"]
-                table_counts[table] = count
+            if tables:
+                count_sql = " UNION ALL ".join(
+                    'SELECT ? AS name, COUNT(*) AS count FROM "{}"'.format(
+                        table.replace('"', '""')
+                    )
+                    for table in tables
+                )
+                cursor.execute(count_sql + ";", tables)
+                table_counts = {row["name"]: row["count"] for row in cursor.fetchall()}
 
             response = {
                 "database": DB_PATH,
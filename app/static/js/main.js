@@ -37,30 +37,33 @@
         });
     }
     
+    /**
+     * 读取CSRF令牌：页面为缓存的静态外壳，令牌取自CSRF中间件设置的cookie
+     */
+    function getCSRFToken() {
+        const match = document.cookie.match(/(?:^|;\s*)csrf_token=([^;]*)/);
+        if (match) {
+            return decodeURIComponent(match[1]);
+        }
+        return '';
+    }
+    
     /**
      * 设置CSRF令牌，确保所有ajax请求都包含CSRF令牌
      */
     function setupCSRFToken() {
-        // 从meta标签获取CSRF令牌
-        const metaTag = document.querySelector('meta[name="csrf-token"]');
-        if (metaTag) {
-            const csrfToken = metaTag.getAttribute('content');
-            
-            // 为所有axios请求添加CSRF令牌
-            axios.defaults.headers.common['X-CSRF-Token'] = csrfToken;
-            
-            // 添加请求拦截器，确保每个请求都包含最新的CSRF令牌
-            axios.interceptors.request.use(function (config) {
+        // 添加请求拦截器，每个请求发送时读取最新的CSRF令牌
+        axios.interceptors.request.use(function (config) {
+            const csrfToken = getCSRFToken();
+            if (csrfToken) {
                 config.headers['X-CSRF-Token'] = csrfToken;
-                return config;
-            }, function (error) {
-                return Promise.reject(error);
-            });
-            
-            console.log('CSRF令牌已设置');
-        } else {
-            console.warn('未找到CSRF令牌元素');
-        }
+            }
+            return config;
+        }, function (error) {
+            return Promise.reject(error);
+        });
+        
+        console.log('CSRF令牌已设置');
     }
     
     /**
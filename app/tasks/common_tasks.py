@@ -8,28 +8,477 @@
 这些任务通常在默认队列中执行。
 """
 
+import os
+import json
 import time
-import uuid
 import logging
+import queue
+import random
+import threading
 import traceback
 import asyncio
-from typing import Dict, Any, Optional, List, Union, Callable
+import concurrent.futures
+import itertools
+from typing import Dict, Any, Optional, List, Union, Callable, Literal, Iterable
 from functools import wraps
 
-from celery import shared_task, Task, states
-from celery.signals import task_prerun, task_postrun, task_failure, task_success
+from celery import shared_task, group, Task, states
+from celery.signals import (
+    task_prerun,
+    task_postrun,
+    task_failure,
+    task_success,
+    worker_process_init,
+    worker_process_shutdown,
+)
 from celery.exceptions import SoftTimeLimitExceeded, Retry
 
+try:
+    import uvloop
+except ImportError:  # Windows等平台没有uvloop，使用标准事件循环
+    uvloop = None
+
 from app.core.celery import celery_app
 from app.models.task import TaskStatus
 from app.services.redis_cache import redis_cache
-from app.db.session import async_session, SessionLocal
-from app.services.task import TaskService
+from app.db.session import async_session, engine, sync_engine, SessionLocal
+from app.services.task import task_service
 
 
 logger = logging.getLogger(__name__)
 
 
+# 后台事件循环：每个Worker进程共享一个在守护线程中运行的事件循环，
+# 状态更新通过run_coroutine_threadsafe提交，避免每次更新都创建和关闭事件循环
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_PID: Optional[int] = None
+_LOOP_THREAD: Optional[threading.Thread] = None
+_LOOP_LOCK = threading.Lock()
+# 串行化后台数据库写入，保证同一任务的状态按提交顺序落库
+_WRITE_LOCK: Optional[asyncio.Lock] = None
+
+# 进度合并表：每个任务只保留最新一次进度（后写覆盖先写），由后台线程定期批量刷新
+_PENDING_STATUS: Dict[str, Dict[str, Any]] = {}
+_PENDING_LOCK = threading.Lock()
+# 刷新锁：定期刷新与任务结束时的强制刷新互斥，保证终止状态不会被旧进度覆盖
+_FLUSH_LOCK = threading.Lock()
+_FLUSHER_PID: Optional[int] = None
+
+# 有界状态更新队列：由每个进程内唯一的写入线程批量消费，队列满时对生产者形成背压
+_UPDATE_QUEUE_SIZE = 10000
+_UPDATE_BATCH_SIZE = 500
+_UPDATE_PUT_TIMEOUT = 5
+_UPDATE_Q: Optional[queue.Queue] = None
+_WRITER_PID: Optional[int] = None
+_WRITER_LOCK = threading.Lock()
+
+# batch_process返回的错误详情条数上限
+_MAX_ERROR_DETAILS = 10
+
+# 任务状态枚举到存储值的映射，避免每次更新都探测value属性
+_STATUS_VALUE: Dict[Any, str] = {s: s.value for s in TaskStatus}
+# 终止状态的更新不能丢弃，队列满时阻塞等待
+_TERMINAL_STATUSES = frozenset(
+    {TaskStatus.SUCCEEDED, TaskStatus.FAILED, TaskStatus.REVOKED}
+)
+# (任务名称, 优先级) -> 队列名称 的缓存，路由规则在进程生命周期内不变
+_QUEUE_CACHE: Dict[tuple, str] = {}
+
+
+def _get_task_queue(task_name: str, priority: Optional[str]) -> str:
+    """
+    获取任务队列名称（带缓存）
+
+    首次解析时延迟导入路由函数以避免循环导入，之后直接查表。
+
+    参数:
+        task_name: 任务名称
+        priority: 任务优先级
+
+    返回:
+        str: 队列名称
+    """
+    key = (task_name, priority)
+    queue_name = _QUEUE_CACHE.get(key)
+    if queue_name is None:
+        from app.celery_app import get_task_queue
+
+        queue_name = _QUEUE_CACHE[key] = get_task_queue(task_name, priority)
+    return queue_name
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    获取后台事件循环
+
+    首次调用时创建事件循环并在守护线程中持续运行，安装了uvloop时使用uvloop事件循环。
+    Celery prefork模式下子进程不会继承父进程的线程，因此按进程ID检测并重新创建。
+
+    返回:
+        asyncio.AbstractEventLoop: 在后台线程中运行的事件循环
+    """
+    global _LOOP, _LOOP_PID, _LOOP_THREAD, _WRITE_LOCK
+
+    pid = os.getpid()
+    if _LOOP is None or _LOOP_PID != pid:
+        with _LOOP_LOCK:
+            if _LOOP is None or _LOOP_PID != pid:
+                loop = (
+                    uvloop.new_event_loop()
+                    if uvloop is not None
+                    else asyncio.new_event_loop()
+                )
+                # Python 3.12+：协程在创建任务时立即执行到第一个真正的挂起点，
+                # 不需要挂起的协程无需再经过一轮事件循环调度
+                if hasattr(asyncio, "eager_task_factory"):
+                    loop.set_task_factory(asyncio.eager_task_factory)
+                thread = threading.Thread(
+                    target=_run_background_loop,
+                    args=(loop,),
+                    name="task-status-loop",
+                    daemon=True,
+                )
+                thread.start()
+                _WRITE_LOCK = asyncio.Lock()
+                _LOOP, _LOOP_PID, _LOOP_THREAD = loop, pid, thread
+    return _LOOP
+
+
+def _run_background_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    后台线程入口：运行事件循环直到被停止，然后清理资源并关闭事件循环
+
+    与asyncio.Runner关闭时的处理一致：取消剩余任务、关闭异步生成器和默认线程池。
+    此外释放异步数据库引擎的连接，避免进程退出时连接未正常关闭。
+
+    参数:
+        loop: 要运行的事件循环
+    """
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        try:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(
+                    asyncio.gather(*pending, return_exceptions=True)
+                )
+            loop.run_until_complete(engine.dispose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        except Exception as e:
+            logger.error("关闭后台事件循环失败: %s", e)
+        finally:
+            loop.close()
+
+
+async def _write_task_status_bulk(updates: List[Dict[str, Any]]) -> None:
+    """
+    批量将任务状态写入数据库
+
+    参数:
+        updates: 更新列表，每项包含task_id、status、progress、result
+    """
+    async with _WRITE_LOCK, async_session() as session:
+        await task_service.bulk_update_task_status(session, updates)
+
+
+def _run_on_background_loop(coro) -> Any:
+    """
+    在后台事件循环中运行协程并等待结果
+
+    等待期间后台事件循环仍可并发处理其他协程（如状态写入）。
+    调用方被中断（如软超时）时取消协程。
+
+    参数:
+        coro: 要运行的协程
+
+    返回:
+        Any: 协程的返回值
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_background_loop())
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def _get_update_queue() -> queue.Queue:
+    """
+    获取状态更新队列
+
+    首次调用时创建有界队列并启动写入线程。与后台事件循环相同，按进程ID检测并在fork后重新创建。
+
+    返回:
+        queue.Queue: 当前进程的状态更新队列
+    """
+    global _UPDATE_Q, _WRITER_PID
+
+    pid = os.getpid()
+    if _WRITER_PID != pid:
+        with _WRITER_LOCK:
+            if _WRITER_PID != pid:
+                update_queue = queue.Queue(maxsize=_UPDATE_QUEUE_SIZE)
+                threading.Thread(
+                    target=_status_writer,
+                    args=(update_queue,),
+                    name="task-status-writer",
+                    daemon=True,
+                ).start()
+                _UPDATE_Q, _WRITER_PID = update_queue, pid
+    return _UPDATE_Q
+
+
+def _write_status_batch(batch: List[tuple]) -> None:
+    """
+    写入一批状态更新
+
+    需要缓存的更新按任务合并后以一次Redis管道写入，全部更新以一次批量UPDATE写入数据库，
+    完成后设置各更新对应Future的结果。批量UPDATE失败时改为逐条写入，
+    避免一条错误数据导致整批更新丢失。
+
+    参数:
+        batch: (更新数据, 是否写缓存, Future) 元组列表
+    """
+    # 各更新的写入结果：None表示成功，否则为异常
+    errors: Dict[int, Optional[BaseException]] = {}
+    failure: Optional[BaseException] = None
+
+    try:
+        cache_items: Dict[str, Dict[str, Any]] = {}
+        for update, cache, _ in batch:
+            if cache:
+                entry = cache_items.setdefault(update["task_id"], {})
+                entry["status"] = _STATUS_VALUE.get(update["status"], update["status"])
+                entry["updated_at"] = update["updated_at"]
+                for key in ("progress", "result", "error"):
+                    if update[key] is not None:
+                        entry[key] = update[key]
+        redis_cache.cache_task_status_bulk(cache_items)
+
+        try:
+            _run_on_background_loop(
+                _write_task_status_bulk([update for update, _, _ in batch])
+            )
+        except Exception as e:
+            logger.error("批量更新任务状态失败，改为逐条更新: %s", e)
+            for index, (update, _, _) in enumerate(batch):
+                try:
+                    _run_on_background_loop(_write_task_status_bulk([update]))
+                except Exception as row_error:
+                    logger.error("更新任务 %s 状态失败: %s", update["task_id"], row_error)
+                    errors[index] = row_error
+                else:
+                    errors[index] = None
+        else:
+            errors = dict.fromkeys(range(len(batch)))
+    except BaseException as e:
+        failure = e
+        raise
+    finally:
+        # 无论是否出现异常都设置全部Future的结果，避免调用方一直等待
+        for index, (_, _, future) in enumerate(batch):
+            error = errors[index] if index in errors else failure
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+def _status_writer(update_queue: queue.Queue) -> None:
+    """写入线程：阻塞等待更新，每次最多取出一批合并写入"""
+    while True:
+        batch = [update_queue.get()]
+        while len(batch) < _UPDATE_BATCH_SIZE:
+            try:
+                batch.append(update_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            _write_status_batch(batch)
+        except Exception as e:
+            logger.error("更新任务状态失败: %s", e)
+        finally:
+            for _ in batch:
+                update_queue.task_done()
+
+
+def _enqueue_status_update(
+    update: Dict[str, Any], cache: bool = True
+) -> concurrent.futures.Future:
+    """
+    将状态更新放入有界队列
+
+    队列已满时，非终止状态的更新最多等待_UPDATE_PUT_TIMEOUT秒，仍无空位则丢弃
+    （后续更新会覆盖它）；终止状态的更新一直阻塞直到入队。
+
+    参数:
+        update: 更新数据，包含task_id、status、progress、result、error、updated_at
+        cache: 是否由写入线程同时刷新Redis缓存
+
+    返回:
+        concurrent.futures.Future: 写入完成的Future对象，更新被丢弃时为已取消状态
+    """
+    future = concurrent.futures.Future()
+    item = (update, cache, future)
+    update_queue = _get_update_queue()
+
+    if update["status"] in _TERMINAL_STATUSES:
+        update_queue.put(item)
+    else:
+        try:
+            update_queue.put(item, timeout=_UPDATE_PUT_TIMEOUT)
+        except queue.Full:
+            logger.warning("状态更新队列已满，丢弃任务 %s 的进度更新", update["task_id"])
+            future.cancel()
+    return future
+
+
+def _submit_status_update(
+    task_id: str,
+    status: TaskStatus,
+    progress: Optional[int] = None,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+    cache: bool = True,
+) -> concurrent.futures.Future:
+    """
+    提交任务状态更新
+
+    将更新放入有界队列，由写入线程批量写入缓存和数据库，立即返回而不等待写入完成。
+    需要等待结果的调用方可以对返回值调用result()。
+
+    参数:
+        task_id: 任务ID
+        status: 新的任务状态
+        progress: 任务进度（0-100）
+        result: 任务结果数据
+        error: 任务错误信息
+        cache: 是否同时刷新Redis缓存
+
+    返回:
+        concurrent.futures.Future: 状态更新的Future对象
+    """
+    return _enqueue_status_update(
+        {
+            "task_id": task_id,
+            "status": status,
+            "progress": progress,
+            "result": result,
+            "error": error,
+            "updated_at": time.time(),
+        },
+        cache=cache,
+    )
+
+
+def _update_status_sync(
+    task_id: str,
+    status: TaskStatus,
+    progress: Optional[int] = None,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> bool:
+    """
+    同步更新任务状态
+
+    通过连接池中的同步会话直接写入数据库并刷新缓存，返回时状态已落库。
+    用于状态需要立即可见的场景（如紧急警报）。
+
+    参数:
+        task_id: 任务ID
+        status: 新的任务状态
+        progress: 任务进度（0-100）
+        result: 任务结果数据
+        error: 任务错误信息
+
+    返回:
+        bool: 是否更新成功
+    """
+    task_data = {"status": _STATUS_VALUE.get(status, status), "updated_at": time.time()}
+    if progress is not None:
+        task_data["progress"] = progress
+    if result is not None:
+        task_data["result"] = result
+    if error is not None:
+        task_data["error"] = error
+
+    try:
+        with SessionLocal() as db:
+            updated = task_service.update_task_status_sync(
+                db, task_id, status, progress=progress, result=result, error=error
+            )
+        redis_cache.cache_task_status(task_id, task_data)
+        return updated
+    except Exception as e:
+        logger.error("更新任务状态失败: %s", e)
+        return False
+
+
+def _flush_pending_status(task_id: Optional[str] = None) -> None:
+    """
+    刷新合并后的进度更新
+
+    取出合并表中的待写入进度放入状态更新队列，由写入线程合并写入缓存和数据库。
+
+    参数:
+        task_id: 只刷新指定任务的进度；为None时刷新全部
+    """
+    global _PENDING_STATUS
+
+    with _FLUSH_LOCK:
+        with _PENDING_LOCK:
+            if task_id is None:
+                snapshot, _PENDING_STATUS = _PENDING_STATUS, {}
+            else:
+                entry = _PENDING_STATUS.pop(task_id, None)
+                snapshot = {task_id: entry} if entry else {}
+
+        # 在刷新锁内入队，保证进度排在同一任务随后的终止状态之前
+        for pending_task_id, entry in snapshot.items():
+            _enqueue_status_update(
+                {
+                    "task_id": pending_task_id,
+                    "status": entry["status"],
+                    "progress": entry["progress"],
+                    "result": entry["result"],
+                    "error": None,
+                    "updated_at": entry["updated_at"],
+                }
+            )
+
+
+def _status_flusher() -> None:
+    """后台刷新线程：按状态报告间隔周期性刷新合并后的进度"""
+    while True:
+        time.sleep(SQLAlchemyTask._status_report_interval)
+        try:
+            _flush_pending_status()
+        except Exception as e:
+            logger.error("刷新任务进度失败: %s", e)
+
+
+def _ensure_status_flusher() -> None:
+    """确保当前进程已启动进度刷新线程"""
+    global _FLUSHER_PID
+
+    pid = os.getpid()
+    if _FLUSHER_PID != pid:
+        with _PENDING_LOCK:
+            if _FLUSHER_PID != pid:
+                threading.Thread(
+                    target=_status_flusher, name="task-status-flusher", daemon=True
+                ).start()
+                _FLUSHER_PID = pid
+
+
 class SQLAlchemyTask(Task):
     """
     自定义Celery任务基类
@@ -98,10 +547,8 @@ class SQLAlchemyTask(Task):
 
         # 如果未指定队列，根据任务优先级选择队列
         if "queue" not in options:
-            priority = kwargs.get("priority", "normal")
-            from app.celery_app import get_task_queue
-
-            options["queue"] = get_task_queue(self.name, priority)
+            priority = (kwargs or {}).get("priority", "normal")
+            options["queue"] = _get_task_queue(self.name, priority)
 
         return super().apply_async(args, kwargs, **options)
 
@@ -128,6 +575,9 @@ class SQLAlchemyTask(Task):
         # 如果包含db_task_id参数，更新任务状态
         db_task_id = kwargs.get("task_id")
         if db_task_id:
+            # 先写出尚未刷新的进度，保证终止状态最后写入
+            _flush_pending_status(db_task_id)
+
             # 异步更新任务状态
             self._update_db_task_status(
                 db_task_id, TaskStatus.SUCCEEDED, progress=100, result=result
@@ -139,8 +589,12 @@ class SQLAlchemyTask(Task):
 
         # 记录性能指标
         logger.info(
-            f"任务 {self.name}[{task_id}] 成功完成，耗时: {self._metrics['total_time']:.2f}秒，"
-            f"数据库操作: {self._metrics['db_time']:.2f}秒 ({self._metrics['db_operations']}次操作)"
+            "任务 %s[%s] 成功完成，耗时: %.2f秒，数据库操作: %.2f秒 (%d次操作)",
+            self.name,
+            task_id,
+            self._metrics["total_time"],
+            self._metrics["db_time"],
+            self._metrics["db_operations"],
         )
 
         return super().on_success(retval, task_id, args, kwargs)
@@ -178,13 +632,23 @@ class SQLAlchemyTask(Task):
                 error_info["retry_count"] = self.request.retries
                 error_info["max_retries"] = self.request.max_retries
 
-            # 异步更新任务状态
-            self._update_db_task_status(db_task_id, status, error=error_info)
+            # 先写出尚未刷新的进度，保证终止状态最后写入
+            _flush_pending_status(db_task_id)
+
+            # 错误信息序列化为字符串，与数据库中Text类型的error列一致
+            self._update_db_task_status(
+                db_task_id,
+                status,
+                error=json.dumps(error_info, ensure_ascii=False, default=str),
+            )
 
         # 记录错误日志
         logger.error(
-            f"任务 {self.name}[{task_id}] 执行失败: {exc}，"
-            f"耗时: {self._metrics['total_time']:.2f}秒"
+            "任务 %s[%s] 执行失败: %s，耗时: %.2f秒",
+            self.name,
+            task_id,
+            exc,
+            self._metrics["total_time"],
         )
 
         return super().on_failure(exc, task_id, args, kwargs, einfo)
@@ -228,7 +692,7 @@ class SQLAlchemyTask(Task):
         """
         任务返回后回调
 
-        在任务返回后清理资源。
+        数据库连接由连接池统一管理，任务返回时无需额外清理。
 
         参数:
             status: 任务状态
@@ -239,14 +703,7 @@ class SQLAlchemyTask(Task):
             einfo: 异常信息
         """
         # 记录日志
-        logger.debug(f"任务 {self.name}[{task_id}] 已返回，状态: {status}")
-
-        # 关闭数据库会话
-        try:
-            db = SessionLocal()
-            db.close()
-        except Exception as e:
-            logger.error(f"关闭数据库会话失败: {e}")
+        logger.debug("任务 %s[%s] 已返回，状态: %s", self.name, task_id, status)
 
         super().after_return(status, retval, task_id, args, kwargs, einfo)
 
@@ -257,7 +714,9 @@ class SQLAlchemyTask(Task):
         更新任务进度
 
         在任务执行过程中周期性地更新进度和状态。
-        为避免频繁更新数据库，使用最小间隔限制更新频率。
+        进度先写入内存中的合并表（同一任务只保留最新一次），
+        由后台线程每隔_status_report_interval秒批量写入缓存和数据库，
+        N次进度回调最终只产生一次写入。
 
         参数:
             db_task_id: 数据库中的任务ID
@@ -265,14 +724,9 @@ class SQLAlchemyTask(Task):
             result: 阶段性结果
 
         返回:
-            bool: 是否成功更新
+            bool: 是否成功记录
         """
-        # 防止频繁更新，限制更新频率
         current_time = time.time()
-        if current_time - self._last_update_time < self._status_report_interval:
-            return False
-
-        # 更新时间戳
         self._last_update_time = current_time
 
         # 确保进度在有效范围内
@@ -288,13 +742,21 @@ class SQLAlchemyTask(Task):
         if result:
             status_data.update(result if isinstance(result, dict) else {"data": result})
 
-        # 异步更新任务状态
-        self._update_db_task_status(
-            db_task_id, TaskStatus.RUNNING, progress=progress, result=status_data
-        )
+        # 记录最新进度，等待后台线程合并写入
+        with _PENDING_LOCK:
+            _PENDING_STATUS[db_task_id] = {
+                "status": TaskStatus.RUNNING,
+                "progress": progress,
+                "result": status_data,
+                "updated_at": current_time,
+            }
+        _ensure_status_flusher()
 
-        # 记录日志
-        logger.debug(f"任务进度更新: {progress}%，耗时: {status_data['elapsed']:.2f}秒")
+        # 记录日志（DEBUG关闭时跳过格式化）
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "任务进度更新: %d%%，耗时: %.2f秒", progress, status_data["elapsed"]
+            )
 
         return True
 
@@ -310,6 +772,8 @@ class SQLAlchemyTask(Task):
         更新任务状态
 
         更新数据库中任务的状态、进度和结果信息。
+        更新放入状态更新队列，由写入线程按入队顺序写入缓存和数据库，
+        保证先刷新的进度不会在终止状态之后写入缓存。
 
         参数:
             task_id: 任务ID
@@ -319,93 +783,64 @@ class SQLAlchemyTask(Task):
             error: 任务错误信息
         """
         try:
-            # 优先使用缓存更新任务状态
-            task_data = {
-                "status": status.value if hasattr(status, "value") else status,
-                "updated_at": time.time(),
-            }
-
-            if progress is not None:
-                task_data["progress"] = progress
-
-            if result is not None:
-                task_data["result"] = result
-
-            if error is not None:
-                task_data["error"] = error
-
-            # 缓存任务状态
-            redis_cache.cache_task_status(task_id, task_data)
-
-            # 使用同步方式更新数据库
-            # 创建一个新的事件循环来运行异步代码
-            def run_async_update():
-                db_time_start = time.time()
-                self._metrics["db_operations"] += 1
-
-                # 创建一个新的事件循环
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-                # 定义异步更新函数
-                async def update_status():
-                    async with async_session() as session:
-                        # 创建任务服务
-                        task_service = TaskService()
-
-                        # 更新任务状态
-                        await task_service.update_task_status(
-                            db=session,
-                            task_id=uuid.UUID(task_id),
-                            status=status,
-                            progress=progress,
-                            result=result,
-                            error=error,
-                        )
-
-                # 运行异步函数并关闭循环
-                try:
-                    loop.run_until_complete(update_status())
-                finally:
-                    loop.close()
+            # 放入状态更新队列异步更新缓存和数据库，不阻塞任务执行
+            db_time_start = time.time()
+            self._metrics["db_operations"] += 1
 
+            def record_db_time(_future):
                 # 记录数据库操作时间
                 self._metrics["db_time"] += time.time() - db_time_start
 
-            # 执行同步封装的异步更新
-            run_async_update()
+            future = _submit_status_update(task_id, status, progress, result, error)
+            future.add_done_callback(record_db_time)
 
         except Exception as e:
-            logger.error(f"更新任务状态失败: {e}")
+            logger.error("更新任务状态失败: %s", e)
 
     def batch_process(
         self,
-        items: List[Any],
+        items: Iterable[Any],
         process_func: Callable,
         batch_size: int = 100,
         task_id: Optional[str] = None,
+        parallelism: Optional[int] = None,
+        executor_kind: Literal["thread", "process"] = "thread",
+        process_batch_func: Optional[Callable] = None,
     ) -> Dict[str, Any]:
         """
         批量处理
 
         对大量数据进行批处理，定期更新进度和状态。
+        指定并行度时，每个批次内的数据项提交到线程池（I/O密集型）
+        或进程池（CPU密集型）并发处理，结果仍按数据项顺序收集。
+        提供整批处理函数时，每个批次只调用一次该函数，分摊每次调用的固定开销；
+        整批处理失败（抛出异常或结果数量不符）时，该批次全部数据项记为错误，不会逐项重试，
+        以免重复执行整批函数可能已提交的副作用。
+        数据项按批次从迭代器中读取，传入生成器时不需要预先将全部数据载入内存。
 
         参数:
-            items: 要处理的数据项列表
+            items: 要处理的数据项，可以是列表或任意可迭代对象（此时总数未知，进度只报告已处理数量）
             process_func: 处理单个数据项的函数，参数为(item, index)
             batch_size: 每批处理的数据项数量
             task_id: 数据库中的任务ID
+            parallelism: 批次内的并行度，None或1表示串行处理
+            executor_kind: 并行执行器类型，"thread"或"process"（进程池要求process_func可序列化）
+            process_batch_func: 整批处理函数，参数为(items, start_index)，返回与items等长的结果列表
 
         返回:
             Dict[str, Any]: 包含处理结果和统计信息的字典
         """
-        total_items = len(items)
+        total_items = len(items) if hasattr(items, "__len__") else None
+        item_iter = iter(items)
+        batch = list(itertools.islice(item_iter, batch_size))
         results = []
+        # 只保留返回的前几个错误详情，其余错误只计数，避免内存随错误数增长
         errors = []
+        error_count = 0
         start_time = time.time()
 
         # 处理空列表情况
-        if total_items == 0:
+        if not batch:
             logger.warning("批处理接收到空列表，跳过处理")
             return {
                 "success": True,
@@ -422,57 +857,118 @@ class SQLAlchemyTask(Task):
                 task_id, 0, {"total_items": total_items, "batch_size": batch_size}
             )
 
-        # 分批处理
-        for i in range(0, total_items, batch_size):
-            batch = items[i : i + batch_size]
-            batch_results = []
-
-            # 处理当前批次
-            for idx, item in enumerate(batch):
-                try:
-                    # 处理单个项目
-                    result = process_func(item, i + idx)
-                    batch_results.append(result)
-                except Exception as e:
-                    # 记录错误
-                    error_info = {
-                        "index": i + idx,
+        def record_error(index, item, e):
+            # 记录错误，只为返回的前几个错误格式化堆栈
+            nonlocal error_count
+            error_count += 1
+            if len(errors) < _MAX_ERROR_DETAILS:
+                errors.append(
+                    {
+                        "index": index,
                         "item": item,
                         "error": str(e),
-                        "traceback": traceback.format_exc(),
+                        "exc_type": type(e).__name__,
+                        "traceback": "".join(
+                            traceback.format_exception(
+                                type(e), e, e.__traceback__, limit=20
+                            )
+                        ),
                     }
-                    errors.append(error_info)
-                    logger.error(f"处理项目 {i + idx} 失败: {e}")
+                )
 
-            # 添加批次结果
-            results.extend(batch_results)
+        # 并行执行器在首次逐项处理时创建，整个批处理过程复用
+        executor = None
 
-            # 更新进度
-            progress = min(int((i + len(batch)) / total_items * 100), 99)
-            if task_id:
-                self.update_progress(
-                    task_id,
-                    progress,
-                    {
-                        "processed": i + len(batch),
-                        "total": total_items,
-                        "errors": len(errors),
-                        "current_batch": i // batch_size + 1,
-                        "total_batches": (total_items + batch_size - 1) // batch_size,
-                    },
-                )
+        try:
+            # 分批处理
+            i = 0
+            while batch:
+                batch_results = []
+
+                if process_batch_func is not None:
+                    # 整批处理，一次调用处理整个批次
+                    try:
+                        batch_results = list(process_batch_func(batch, i))
+                        if len(batch_results) != len(batch):
+                            raise ValueError(
+                                f"返回 {len(batch_results)} 个结果，期望 {len(batch)} 个"
+                            )
+                    except Exception as e:
+                        logger.error("批次 %d 整批处理失败: %s", i // batch_size + 1, e)
+                        batch_results = []
+                        for idx, item in enumerate(batch):
+                            record_error(i + idx, item, e)
+                else:
+                    # 并行模式下先提交整个批次
+                    futures = None
+                    if parallelism and parallelism > 1:
+                        if executor is None:
+                            executor_cls = (
+                                concurrent.futures.ProcessPoolExecutor
+                                if executor_kind == "process"
+                                else concurrent.futures.ThreadPoolExecutor
+                            )
+                            executor = executor_cls(max_workers=parallelism)
+                        futures = [
+                            executor.submit(process_func, item, i + idx)
+                            for idx, item in enumerate(batch)
+                        ]
+
+                    # 处理当前批次
+                    for idx, item in enumerate(batch):
+                        try:
+                            # 处理单个项目
+                            if futures is not None:
+                                result = futures[idx].result()
+                            else:
+                                result = process_func(item, i + idx)
+                            batch_results.append(result)
+                        except Exception as e:
+                            record_error(i + idx, item, e)
+                            logger.error("处理项目 %d 失败: %s", i + idx, e)
+
+                # 添加批次结果
+                results.extend(batch_results)
+
+                # 更新进度，总数未知时只报告已处理数量
+                processed = i + len(batch)
+                if task_id:
+                    progress = (
+                        min(int(processed / total_items * 100), 99) if total_items else 0
+                    )
+                    self.update_progress(
+                        task_id,
+                        progress,
+                        {
+                            "processed": processed,
+                            "total": total_items,
+                            "errors": error_count,
+                            "current_batch": i // batch_size + 1,
+                            "total_batches": (total_items + batch_size - 1)
+                            // batch_size
+                            if total_items
+                            else None,
+                        },
+                    )
+
+                # 读取下一批次
+                i = processed
+                batch = list(itertools.islice(item_iter, batch_size))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
 
         # 计算处理时间
         elapsed_time = time.time() - start_time
 
         # 生成结果
         result = {
-            "success": len(errors) == 0,
-            "processed": total_items,
-            "errors": len(errors),
+            "success": error_count == 0,
+            "processed": i,
+            "errors": error_count,
             "time": elapsed_time,
             "results": results,
-            "error_details": errors[:10],  # 只返回前10个错误详情
+            "error_details": errors,
         }
 
         # 最终更新进度
@@ -482,6 +978,49 @@ class SQLAlchemyTask(Task):
         return result
 
 
+@worker_process_init.connect
+def on_worker_process_init(**kwargs):
+    """
+    Worker子进程初始化的信号处理函数
+
+    丢弃从父进程fork继承的连接池（不关闭父进程仍在使用的连接），
+    使每个Worker子进程建立并复用自己的数据库连接池。
+    """
+    engine.sync_engine.dispose(close=False)
+    sync_engine.dispose(close=False)
+    logger.info(f"Worker进程 {os.getpid()} 已重置数据库连接池")
+
+
+@worker_process_shutdown.connect
+def on_worker_process_shutdown(**kwargs):
+    """
+    Worker子进程退出的信号处理函数
+
+    写出尚未刷新的进度，等待状态更新队列写完（最多5秒），然后停止后台事件循环，
+    并等待事件循环线程清理资源（最多5秒）。
+    """
+    global _LOOP
+
+    pid = os.getpid()
+    try:
+        _flush_pending_status()
+        deadline = time.time() + 5
+        while (
+            _WRITER_PID == pid
+            and _UPDATE_Q.unfinished_tasks
+            and time.time() < deadline
+        ):
+            time.sleep(0.05)
+    except Exception as e:
+        logger.error("退出前写入任务状态失败: %s", e)
+    finally:
+        with _LOOP_LOCK:
+            if _LOOP is not None and _LOOP_PID == pid:
+                _LOOP.call_soon_threadsafe(_LOOP.stop)
+                _LOOP_THREAD.join(5)
+                _LOOP = None
+
+
 @task_prerun.connect
 def on_task_prerun(task_id=None, task=None, args=None, kwargs=None, **kw):
     """
@@ -600,15 +1139,12 @@ def auto_retry(max_retries=3, retry_backoff=True, retry_jitter=True):
                 # 计算重试延迟
                 retry_delay = 1
                 if retry_backoff:
-                    # 指数退避: 1, 2, 4, 8, 16, ...
-                    retry_delay = 2**retries
+                    # 指数退避: 1, 2, 4, 8, 16, ...，最长60秒
+                    retry_delay = min(1 << retries, 60)
 
                 if retry_jitter:
                     # 添加随机抖动 (±30%)
-                    import random
-
-                    jitter = random.uniform(0.7, 1.3)
-                    retry_delay *= jitter
+                    retry_delay *= 0.7 + random.random() * 0.6
 
                 logger.info(
                     f"任务将在 {retry_delay:.2f} 秒后重试 (尝试 {retries + 1}/{max_retries})"
@@ -648,24 +1184,27 @@ def long_running_task(
     # 模拟长时间运行的任务
     start_time = time.time()
 
-    for i in range(seconds):
-        # 计算进度
-        progress = int((i + 1) / seconds * 100)
+    async def run_steps():
+        for i in range(seconds):
+            # 计算进度
+            progress = int((i + 1) / seconds * 100)
 
-        # 更新任务状态
-        if task_id:
-            self.update_progress(
-                task_id,
-                progress,
-                {
-                    "current_step": i + 1,
-                    "total_steps": seconds,
-                    "message": f"处理步骤 {i + 1}/{seconds}",
-                },
-            )
+            # 更新任务状态
+            if task_id:
+                self.update_progress(
+                    task_id,
+                    progress,
+                    {
+                        "current_step": i + 1,
+                        "total_steps": seconds,
+                        "message": f"处理步骤 {i + 1}/{seconds}",
+                    },
+                )
 
-        # 模拟处理
-        time.sleep(1)
+            # 模拟处理，等待期间不占用事件循环
+            await asyncio.sleep(1)
+
+    _run_on_background_loop(run_steps())
 
     # 计算总耗时
     total_time = time.time() - start_time
@@ -699,28 +1238,41 @@ def batch_process_items(
     """
     logger.info(f"开始批量处理 {len(items)} 个数据项")
 
-    # 定义单个项目的处理函数
+    # 定义单个项目的处理函数（batch_process的必需参数，提供整批处理函数时不会调用）
     def process_item(item, index):
         # 模拟处理单个项目
         time.sleep(0.1)  # 模拟处理时间
         return {"index": index, "value": item, "processed": True}
 
-    # 使用批处理函数
-    result = self.batch_process(items, process_item, batch_size=50, task_id=task_id)
+    # 定义整批处理函数：实际实现中应一次完成整个批次的I/O，
+    # 例如 session.execute(insert(Item), [dict(...) for item in batch]) 批量写入
+    def process_items(batch, start_index):
+        # 模拟一次往返处理整个批次
+        time.sleep(0.1)
+        return [
+            {"index": start_index + idx, "value": item, "processed": True}
+            for idx, item in enumerate(batch)
+        ]
+
+    # 使用批处理函数，每个批次一次调用
+    result = self.batch_process(
+        items,
+        process_item,
+        batch_size=50,
+        task_id=task_id,
+        process_batch_func=process_items,
+    )
 
     logger.info(f"批量处理完成，处理了 {result['processed']} 个项目，有 {result['errors']} 个错误")
 
     return result
 
 
-@shared_task
-def send_notification(
+def _deliver_notification(
     user_id: str, message: str, notification_type: str = "info"
 ) -> Dict[str, Any]:
     """
-    发送通知
-
-    发送通知给指定用户。
+    投递单条通知
 
     参数:
         user_id: 用户ID
@@ -747,6 +1299,81 @@ def send_notification(
     }
 
 
+@shared_task
+def send_notification(
+    user_id: str, message: str, notification_type: str = "info"
+) -> Dict[str, Any]:
+    """
+    发送通知
+
+    发送通知给指定用户。
+
+    参数:
+        user_id: 用户ID
+        message: 通知消息
+        notification_type: 通知类型 (info, warning, error)
+
+    返回:
+        Dict[str, Any]: 发送结果
+    """
+    return _deliver_notification(user_id, message, notification_type)
+
+
+@shared_task
+def send_notifications_bulk(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    批量发送通知
+
+    在一个任务内依次发送多条通知，N条通知只需要一次任务投递。
+    单条通知失败不会影响其余通知的发送。
+
+    参数:
+        payloads: 通知参数列表，每项包含user_id、message，可选notification_type
+
+    返回:
+        Dict[str, Any]: 批量发送结果
+    """
+    results = []
+    failed = 0
+    for payload in payloads:
+        try:
+            results.append(_deliver_notification(**payload))
+        except Exception as e:
+            failed += 1
+            logger.error(f"发送通知给用户 {payload.get('user_id')} 失败: {e}")
+            results.append(
+                {"success": False, "user_id": payload.get("user_id"), "error": str(e)}
+            )
+
+    return {
+        "success": failed == 0,
+        "total": len(payloads),
+        "failed": failed,
+        "results": results,
+    }
+
+
+def enqueue_notifications(payloads: List[Dict[str, Any]], **options):
+    """
+    一次性投递多条通知任务
+
+    使用group将所有send_notification消息通过同一个生产者连接发布，
+    替代在循环中逐条调用send_notification.delay()。
+
+    参数:
+        payloads: 通知参数列表，每项为send_notification的关键字参数
+        **options: 传递给apply_async的其他选项（如queue）
+
+    返回:
+        GroupResult: 组任务结果，payloads为空时返回None
+    """
+    if not payloads:
+        return None
+    return group(send_notification.s(**payload) for payload in payloads).apply_async(
+        **options
+    )
+
+
 @shared_task(bind=True, base=SQLAlchemyTask)
 @auto_retry(max_retries=3, retry_backoff=True)
 def cleanup_old_data(
@@ -766,29 +1393,32 @@ def cleanup_old_data(
     """
     logger.info(f"开始清理 {days} 天之前的旧数据")
 
-    # 如果有任务ID，更新初始进度
-    if task_id:
-        self.update_progress(task_id, 10, {"message": "开始清理旧数据"})
+    async def run_cleanup():
+        # 如果有任务ID，更新初始进度
+        if task_id:
+            self.update_progress(task_id, 10, {"message": "开始清理旧数据"})
 
-    # 在这里实现实际的数据清理逻辑
-    # 例如，删除旧日志、临时文件等
+        # 在这里实现实际的数据清理逻辑
+        # 例如，删除旧日志、临时文件等
 
-    # 模拟清理过程
-    time.sleep(2)
+        # 模拟清理过程
+        await asyncio.sleep(2)
 
-    # 更新进度到50%
-    if task_id:
-        self.update_progress(task_id, 50, {"message": "清理临时文件"})
+        # 更新进度到50%
+        if task_id:
+            self.update_progress(task_id, 50, {"message": "清理临时文件"})
 
-    # 继续模拟清理
-    time.sleep(1)
+        # 继续模拟清理
+        await asyncio.sleep(1)
 
-    # 更新进度到80%
-    if task_id:
-        self.update_progress(task_id, 80, {"message": "清理数据库记录"})
+        # 更新进度到80%
+        if task_id:
+            self.update_progress(task_id, 80, {"message": "清理数据库记录"})
+
+        # 完成清理
+        await asyncio.sleep(1)
 
-    # 完成清理
-    time.sleep(1)
+    _run_on_background_loop(run_cleanup())
 
     result = {
         "message": f"成功清理了 {days} 天之前的旧数据",
@@ -10,18 +10,56 @@
 
 import time
 import uuid
+import random
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from celery import shared_task
 
 from app.models.task import TaskStatus
-from app.tasks.common_tasks import SQLAlchemyTask
+from app.tasks.common_tasks import (
+    SQLAlchemyTask,
+    _run_on_background_loop,
+    _update_status_sync,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
+async def _check_component(component: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    检查单个组件的健康状态
+
+    参数:
+        component: 组件名称
+
+    返回:
+        Tuple[str, Dict[str, Any]]: 组件名称和检查结果
+    """
+    # 模拟组件检查，等待期间不占用事件循环
+    # 这里应该是实际检查各组件健康状态的逻辑
+    await asyncio.sleep(0.5)
+
+    # 模拟检查结果（在实际环境中，这应该是真实的健康检查）
+    # 为了示例，我们随机生成一些健康状态
+    is_healthy = random.random() > 0.1  # 90%概率健康
+
+    # 记录检查结果
+    component_result = {
+        "healthy": is_healthy,
+        "response_time_ms": random.randint(5, 100),
+        "check_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+    # 如果不健康，添加错误信息
+    if not is_healthy:
+        component_result["error"] = "组件响应时间过长"
+
+    return component, component_result
+
+
 @shared_task(bind=True, base=SQLAlchemyTask)
 def system_health_check(
     self, components: Optional[List[str]] = None, task_id: Optional[str] = None
@@ -59,87 +97,23 @@ def system_health_check(
         "unhealthy_components": 0,
     }
 
-    # 如果提供了task_id，更新任务状态
-    if task_id:
-        import asyncio
+    # 开始和结束状态由SQLAlchemyTask的before_start/on_success各写入一次，
+    # 检查过程中不再单独写入状态
+    async def check_components():
+        # 并发检查所有组件，总耗时取决于最慢的组件
+        return await asyncio.gather(*(_check_component(c) for c in components))
 
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(
-            self.update_task_status(
-                task_id=task_id,
-                status=TaskStatus.RUNNING,
-                progress=0,
-                result={"message": "开始健康检查..."},
-            )
-        )
-        loop.close()
-
-    # 检查每个组件
-    for i, component in enumerate(components):
-        # 计算进度
-        progress = int((i + 1) / len(components) * 100)
-
-        # 更新任务进度
-        if task_id:
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.RUNNING,
-                    progress=progress,
-                    result={"message": f"正在检查组件: {component}..."},
-                )
-            )
-            loop.close()
-
-        # 模拟组件检查
-        # 这里应该是实际检查各组件健康状态的逻辑
-        time.sleep(0.5)
-
-        # 模拟检查结果（在实际环境中，这应该是真实的健康检查）
-        # 为了示例，我们随机生成一些健康状态
-        import random
-
-        is_healthy = random.random() > 0.1  # 90%概率健康
-
-        # 记录检查结果
-        component_result = {
-            "healthy": is_healthy,
-            "response_time_ms": random.randint(5, 100),
-            "check_time": time.strftime("%Y-%m-%d %H:%M:%S"),
-        }
-
-        # 如果不健康，添加错误信息
-        if not is_healthy:
-            component_result["error"] = "组件响应时间过长"
+    for component, component_result in _run_on_background_loop(check_components()):
+        # 统计检查结果
+        if component_result["healthy"]:
+            result["healthy_components"] += 1
+        else:
             result["success"] = False
             result["unhealthy_components"] += 1
-        else:
-            result["healthy_components"] += 1
 
         # 添加到结果中
         result["components"][component] = component_result
 
-    # 更新任务状态为成功
-    if task_id:
-        import asyncio
-
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(
-            self.update_task_status(
-                task_id=task_id,
-                status=TaskStatus.SUCCEEDED,
-                progress=100,
-                result=result,
-            )
-        )
-        loop.close()
-
     logger.info(f"系统健康检查完成，结果: {'全部正常' if result['success'] else '发现问题'}")
 
     return result
@@ -187,19 +161,12 @@ def emergency_alert(
 
     # 如果提供了task_id，更新任务状态
     if task_id:
-        import asyncio
-
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(
-            self.update_task_status(
-                task_id=task_id,
-                status=TaskStatus.RUNNING,
-                progress=0,
-                result={"message": f"处理紧急警报: {alert_type}..."},
-            )
+        _update_status_sync(
+            task_id=task_id,
+            status=TaskStatus.RUNNING,
+            progress=0,
+            result={"message": f"处理紧急警报: {alert_type}..."},
         )
-        loop.close()
 
     try:
         # 模拟警报处理
@@ -224,19 +191,12 @@ def emergency_alert(
 
             # 更新任务进度
             if task_id:
-                import asyncio
-
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(
-                    self.update_task_status(
-                        task_id=task_id,
-                        status=TaskStatus.RUNNING,
-                        progress=progress,
-                        result={"message": f"警报处理步骤: {step}"},
-                    )
+                _update_status_sync(
+                    task_id=task_id,
+                    status=TaskStatus.RUNNING,
+                    progress=progress,
+                    result={"message": f"警报处理步骤: {step}"},
                 )
-                loop.close()
 
             # 模拟处理时间
             time.sleep(0.5)
@@ -247,19 +207,12 @@ def emergency_alert(
 
         # 更新任务状态为成功
         if task_id:
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.SUCCEEDED,
-                    progress=100,
-                    result=result,
-                )
+            _update_status_sync(
+                task_id=task_id,
+                status=TaskStatus.SUCCEEDED,
+                progress=100,
+                result=result,
             )
-            loop.close()
 
         logger.info(f"紧急警报已处理: {alert_type}")
 
@@ -272,18 +225,11 @@ def emergency_alert(
 
         # 更新任务状态为失败
         if task_id:
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.FAILED,
-                    progress=100,
-                    error=str(e),
-                )
+            _update_status_sync(
+                task_id=task_id,
+                status=TaskStatus.FAILED,
+                progress=100,
+                error=str(e),
             )
-            loop.close()
 
     return result
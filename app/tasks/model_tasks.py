@@ -10,20 +10,24 @@
 
 import os
 import time
-import uuid
 import logging
 import shutil
 from typing import Dict, Any, Optional, List, Tuple
 
 from celery import shared_task
 
-from app.models.task import TaskStatus
+from app.core.config import settings
 from app.models.model import ModelStatus
-from app.tasks.common_tasks import SQLAlchemyTask
+from app.db.session import async_session
+from app.services.model import model_service
+from app.tasks.common_tasks import SQLAlchemyTask, _run_on_background_loop
 
 
 logger = logging.getLogger(__name__)
 
+# 模拟每个阶段的处理耗时（秒）
+_SIMULATED_STAGE_DELAY = 0.05
+
 
 @shared_task(bind=True, base=SQLAlchemyTask)
 def deploy_model(
@@ -55,43 +59,19 @@ def deploy_model(
         "deployment_config": deployment_config or {},
     }
 
-    # 如果提供了task_id，更新任务状态
-    if task_id:
-        import asyncio
-
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(
-            self.update_task_status(
-                task_id=task_id,
-                status=TaskStatus.RUNNING,
-                progress=0,
-                result={"message": "准备部署模型..."},
-            )
-        )
-        loop.close()
-
+    # 开始、成功和失败状态由SQLAlchemyTask的before_start/on_success/on_failure写入，
+    # 任务中只记录阶段进度
     try:
-        # 1. 更新模型状态为部署中
-        import asyncio
-        from app.db.session import async_session
-        from app.services.model import ModelService
-
-        async def update_model_status():
+        # 1. 获取模型信息（部署进度由任务状态体现，不单独写入部署中状态）
+        async def get_model():
             async with async_session() as session:
-                model_service = ModelService()
-                model = await model_service.get_model(session, uuid.UUID(model_id))
+                model = await model_service.get(session, model_id)
                 if not model:
                     raise ValueError(f"模型不存在: {model_id}")
-                return await model_service.update_model_status(
-                    session, model.id, ModelStatus.DEPLOYING
-                )
+                return model
 
-        # 执行异步更新
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        model = loop.run_until_complete(update_model_status())
-        loop.close()
+        # 执行异步查询
+        model = _run_on_background_loop(get_model())
 
         # 获取模型信息
         model_name = model.name
@@ -100,17 +80,7 @@ def deploy_model(
 
         # 更新任务进度
         if task_id:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.RUNNING,
-                    progress=10,
-                    result={"message": f"正在部署模型: {model_name}..."},
-                )
-            )
-            loop.close()
+            self.update_progress(task_id, 10, {"message": f"正在部署模型: {model_name}..."})
 
         # 2. 模拟部署过程
         # 这里应该是实际的模型部署逻辑，例如：
@@ -130,22 +100,13 @@ def deploy_model(
         ]
 
         for stage, progress in deployment_stages:
-            # 更新任务进度
+            # 更新任务进度（合并后定期写入，不必每个阶段都写库）
             if task_id:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(
-                    self.update_task_status(
-                        task_id=task_id,
-                        status=TaskStatus.RUNNING,
-                        progress=progress,
-                        result={"message": f"部署阶段: {stage}"},
-                    )
-                )
-                loop.close()
+                self.update_progress(task_id, progress, {"message": f"部署阶段: {stage}"})
 
             # 模拟处理时间
-            time.sleep(1)
+            if settings.SIMULATE_STAGES:
+                time.sleep(_SIMULATED_STAGE_DELAY)
 
         # 生成模拟的API端点URL
         endpoint_url = f"/api/models/{model_id}/predict"
@@ -153,19 +114,15 @@ def deploy_model(
         # 3. 更新模型状态为已部署
         async def update_model_deployed():
             async with async_session() as session:
-                model_service = ModelService()
                 return await model_service.update_model(
                     session,
-                    model_id=uuid.UUID(model_id),
+                    model_id=model_id,
                     status=ModelStatus.DEPLOYED,
                     endpoint_url=endpoint_url,
                 )
 
         # 执行异步更新
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        updated_model = loop.run_until_complete(update_model_deployed())
-        loop.close()
+        updated_model = _run_on_background_loop(update_model_deployed())
 
         # 部署成功
         result.update(
@@ -178,20 +135,6 @@ def deploy_model(
             }
         )
 
-        # 更新任务状态为成功
-        if task_id:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.SUCCEEDED,
-                    progress=100,
-                    result=result,
-                )
-            )
-            loop.close()
-
         logger.info(f"模型部署成功: {model_id}, 端点: {endpoint_url}")
 
     except Exception as e:
@@ -199,48 +142,19 @@ def deploy_model(
 
         # 更新模型状态为错误
         try:
-            import asyncio
-            from app.db.session import async_session
-            from app.services.model import ModelService
-
             async def update_model_error():
                 async with async_session() as session:
-                    model_service = ModelService()
-                    return await model_service.update_model_status(
-                        session, uuid.UUID(model_id), ModelStatus.INVALID
+                    return await model_service.update_model(
+                        session, model_id=model_id, status=ModelStatus.INVALID
                     )
 
             # 执行异步更新
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(update_model_error())
-            loop.close()
+            _run_on_background_loop(update_model_error())
         except Exception as update_error:
             logger.error(f"更新模型状态失败: {update_error}")
 
-        # 更新任务状态为失败
-        if task_id:
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.FAILED,
-                    progress=100,
-                    error=str(e),
-                )
-            )
-            loop.close()
-
-        # 更新结果
-        result.update(
-            {
-                "success": False,
-                "error": str(e),
-            }
-        )
+        # 重新抛出异常，由on_failure记录任务失败状态
+        raise
 
     return result
 
@@ -274,43 +188,19 @@ def validate_model(
         "validation_config": validation_config or {},
     }
 
-    # 如果提供了task_id，更新任务状态
-    if task_id:
-        import asyncio
-
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(
-            self.update_task_status(
-                task_id=task_id,
-                status=TaskStatus.RUNNING,
-                progress=0,
-                result={"message": "准备验证模型..."},
-            )
-        )
-        loop.close()
-
+    # 开始、成功和失败状态由SQLAlchemyTask的before_start/on_success/on_failure写入，
+    # 任务中只记录阶段进度
     try:
-        # 1. 更新模型状态为验证中
-        import asyncio
-        from app.db.session import async_session
-        from app.services.model import ModelService
-
-        async def update_model_status():
+        # 1. 获取模型信息（验证进度由任务状态体现，不单独写入验证中状态）
+        async def get_model():
             async with async_session() as session:
-                model_service = ModelService()
-                model = await model_service.get_model(session, uuid.UUID(model_id))
+                model = await model_service.get(session, model_id)
                 if not model:
                     raise ValueError(f"模型不存在: {model_id}")
-                return await model_service.update_model_status(
-                    session, model.id, ModelStatus.VALIDATING
-                )
+                return model
 
-        # 执行异步更新
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        model = loop.run_until_complete(update_model_status())
-        loop.close()
+        # 执行异步查询
+        model = _run_on_background_loop(get_model())
 
         # 获取模型信息
         model_name = model.name
@@ -319,17 +209,7 @@ def validate_model(
 
         # 更新任务进度
         if task_id:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.RUNNING,
-                    progress=10,
-                    result={"message": f"正在验证模型: {model_name}..."},
-                )
-            )
-            loop.close()
+            self.update_progress(task_id, 10, {"message": f"正在验证模型: {model_name}..."})
 
         # 2. 模拟验证过程
         # 这里应该是实际的模型验证逻辑
@@ -344,22 +224,13 @@ def validate_model(
         ]
 
         for stage, progress in validation_stages:
-            # 更新任务进度
+            # 更新任务进度（合并后定期写入，不必每个阶段都写库）
             if task_id:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(
-                    self.update_task_status(
-                        task_id=task_id,
-                        status=TaskStatus.RUNNING,
-                        progress=progress,
-                        result={"message": f"验证阶段: {stage}"},
-                    )
-                )
-                loop.close()
+                self.update_progress(task_id, progress, {"message": f"验证阶段: {stage}"})
 
             # 模拟处理时间
-            time.sleep(1)
+            if settings.SIMULATE_STAGES:
+                time.sleep(_SIMULATED_STAGE_DELAY)
 
         # 模拟验证结果指标
         metrics = {
@@ -373,20 +244,16 @@ def validate_model(
         # 3. 更新模型状态为已验证
         async def update_model_validated():
             async with async_session() as session:
-                model_service = ModelService()
                 return await model_service.update_model(
                     session,
-                    model_id=uuid.UUID(model_id),
+                    model_id=model_id,
                     status=ModelStatus.VALID,
                     accuracy=metrics["accuracy"],
                     latency=metrics["latency_ms"],
                 )
 
         # 执行异步更新
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        updated_model = loop.run_until_complete(update_model_validated())
-        loop.close()
+        updated_model = _run_on_background_loop(update_model_validated())
 
         # 验证成功
         result.update(
@@ -399,20 +266,6 @@ def validate_model(
             }
         )
 
-        # 更新任务状态为成功
-        if task_id:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.SUCCEEDED,
-                    progress=100,
-                    result=result,
-                )
-            )
-            loop.close()
-
         logger.info(f"模型验证成功: {model_id}, 准确率: {metrics['accuracy']}")
 
     except Exception as e:
@@ -420,47 +273,18 @@ def validate_model(
 
         # 更新模型状态为错误
         try:
-            import asyncio
-            from app.db.session import async_session
-            from app.services.model import ModelService
-
             async def update_model_error():
                 async with async_session() as session:
-                    model_service = ModelService()
-                    return await model_service.update_model_status(
-                        session, uuid.UUID(model_id), ModelStatus.INVALID
+                    return await model_service.update_model(
+                        session, model_id=model_id, status=ModelStatus.INVALID
                     )
 
             # 执行异步更新
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(update_model_error())
-            loop.close()
+            _run_on_background_loop(update_model_error())
         except Exception as update_error:
             logger.error(f"更新模型状态失败: {update_error}")
 
-        # 更新任务状态为失败
-        if task_id:
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(
-                self.update_task_status(
-                    task_id=task_id,
-                    status=TaskStatus.FAILED,
-                    progress=100,
-                    error=str(e),
-                )
-            )
-            loop.close()
-
-        # 更新结果
-        result.update(
-            {
-                "success": False,
-                "error": str(e),
-            }
-        )
+        # 重新抛出异常，由on_failure记录任务失败状态
+        raise
 
     return result
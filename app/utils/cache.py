@@ -8,17 +8,19 @@
 实现了多级缓存策略，支持内存缓存和Redis缓存。
 """
 
-import pickle
 import hashlib
+import inspect
 import json
 import time
 import logging
+from collections import OrderedDict
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TypeVar, cast
 
-import redis
+import msgpack
+import orjson
+import redis.asyncio as aioredis
 from fastapi import Request, Response
-from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.utils.dependencies import get_redis_client
@@ -28,6 +30,79 @@ from app.utils.dependencies import get_redis_client
 T = TypeVar("T")
 CacheableResponse = TypeVar("CacheableResponse")
 
+# 序列化格式前缀：JSON数据使用orjson，Response对象使用msgpack
+_JSON_PREFIX = b"j"
+_RESPONSE_PREFIX = b"m"
+
+# 清除缓存时每批扫描和删除的键数量
+_CLEAR_BATCH_SIZE = 500
+
+# 内存缓存的最大条目数
+_MEMORY_CACHE_MAXSIZE = 10_000
+
+# 区分"未命中"和缓存值为None
+_MISSING = object()
+
+
+def _json_default(value: Any) -> Any:
+    """orjson无法直接序列化的对象：Pydantic模型转换为字典"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"无法序列化类型: {type(value).__name__}")
+
+
+def _serialize(value: Any) -> bytes:
+    """
+    序列化缓存值
+
+    Response对象以msgpack保存状态码、响应头和响应体，其他值以orjson保存。
+
+    参数:
+        value: 缓存值
+
+    返回:
+        bytes: 带格式前缀的序列化数据
+
+    异常:
+        TypeError: 值无法序列化时抛出
+    """
+    if isinstance(value, Response):
+        if not hasattr(value, "body"):
+            raise TypeError(f"无法序列化流式响应: {type(value).__name__}")
+        return _RESPONSE_PREFIX + msgpack.packb(
+            {
+                "body": bytes(value.body),
+                "headers": [list(header) for header in value.raw_headers],
+                "status": value.status_code,
+            },
+            use_bin_type=True,
+        )
+    return _JSON_PREFIX + orjson.dumps(value, default=_json_default)
+
+
+def _deserialize(data: bytes) -> Any:
+    """
+    反序列化缓存值
+
+    参数:
+        data: 带格式前缀的序列化数据
+
+    返回:
+        Any: 缓存值
+
+    异常:
+        ValueError: 数据格式未知时抛出
+    """
+    prefix, payload = data[:1], data[1:]
+    if prefix == _JSON_PREFIX:
+        return orjson.loads(payload)
+    if prefix == _RESPONSE_PREFIX:
+        cached = msgpack.unpackb(payload, raw=False)
+        response = Response(content=cached["body"], status_code=cached["status"])
+        response.raw_headers = [tuple(header) for header in cached["headers"]]
+        return response
+    raise ValueError("未知的缓存数据格式")
+
 
 class CacheManager:
     """
@@ -37,10 +112,7 @@ class CacheManager:
     支持缓存过期、自动刷新等功能。
     """
 
-    # 内存缓存，仅用于本地开发环境或小型部署
-    _memory_cache: Dict[str, Dict[str, Any]] = {}
-
-    def __init__(self, redis_client: Optional[redis.Redis] = None):
+    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
         """
         初始化缓存管理器
 
@@ -48,6 +120,47 @@ class CacheManager:
             redis_client: Redis客户端实例
         """
         self._redis = redis_client
+        # 内存缓存：键 -> (值, 过期时间)，按最近使用顺序排列，超出容量时淘汰最久未使用的条目
+        # 过期时间使用单调时钟，不受系统时间调整影响
+        self._memory_cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    def set_memory(self, key: str, value: Any, ttl: float) -> None:
+        """
+        只写入内存缓存，并按LRU淘汰超出容量的条目
+
+        参数:
+            key: 缓存键
+            value: 缓存值
+            ttl: 内存缓存有效期（秒）
+        """
+        self._memory_cache[key] = (value, time.monotonic() + ttl)
+        self._memory_cache.move_to_end(key)
+        while len(self._memory_cache) > _MEMORY_CACHE_MAXSIZE:
+            self._memory_cache.popitem(last=False)
+
+    def get_memory(self, key: str, default: Any = None) -> Any:
+        """
+        只从内存缓存获取值，不访问Redis
+
+        参数:
+            key: 缓存键
+            default: 默认值
+
+        返回:
+            Any: 缓存值或默认值
+        """
+        try:
+            value, expires_at = self._memory_cache[key]
+        except KeyError:
+            return default
+
+        # 检查是否过期
+        if expires_at > time.monotonic():
+            self._memory_cache.move_to_end(key)
+            return value
+        # 过期则移除
+        del self._memory_cache[key]
+        return default
 
     async def get(self, key: str, default: Any = None) -> Any:
         """
@@ -63,27 +176,20 @@ class CacheManager:
             Any: 缓存值或默认值
         """
         # 先从内存缓存获取
-        if key in self._memory_cache:
-            cache_item = self._memory_cache[key]
-            # 检查是否过期
-            if cache_item.get("expires_at", float("inf")) > time.time():
-                return cache_item.get("value", default)
-            # 过期则移除
-            self._memory_cache.pop(key, None)
+        value = self.get_memory(key, _MISSING)
+        if value is not _MISSING:
+            return value
 
         # 从Redis获取
         if self._redis:
             try:
                 # 异步从Redis获取
-                data = await run_in_threadpool(self._redis.get, key)
+                data = await self._redis.get(key)
                 if data:
                     # 反序列化数据
-                    value = pickle.loads(data)
-                    # 更新内存缓存
-                    self._memory_cache[key] = {
-                        "value": value,
-                        "expires_at": time.time() + 60,  # 内存缓存60秒
-                    }
+                    value = _deserialize(data)
+                    # 更新内存缓存，内存缓存60秒
+                    self.set_memory(key, value, 60)
                     return value
             except Exception as e:
                 logging.error(f"Redis缓存获取错误: {str(e)}")
@@ -107,19 +213,22 @@ class CacheManager:
         返回:
             bool: 操作是否成功
         """
-        # 更新内存缓存
-        self._memory_cache[key] = {
-            "value": value,
-            "expires_at": time.time() + min(expire, 300),  # 内存缓存最长5分钟
-        }
+        # 更新内存缓存，内存缓存最长5分钟
+        self.set_memory(key, value, min(expire, 300))
 
         # 更新Redis缓存
         if self._redis and not memory_only:
             try:
                 # 序列化数据
-                data = pickle.dumps(value)
+                data = _serialize(value)
+            except TypeError as e:
+                # 无法序列化的对象（如ORM实例）只保留内存缓存
+                logging.debug(f"缓存值无法序列化，跳过Redis缓存: {str(e)}")
+                return False
+
+            try:
                 # 异步设置Redis缓存
-                result = await run_in_threadpool(self._redis.setex, key, expire, data)
+                result = await self._redis.setex(key, expire, data)
                 return result
             except Exception as e:
                 logging.error(f"Redis缓存设置错误: {str(e)}")
@@ -145,7 +254,7 @@ class CacheManager:
         # 从Redis缓存中删除
         if self._redis:
             try:
-                result = await run_in_threadpool(self._redis.delete, key)
+                result = await self._redis.delete(key)
                 return bool(result)
             except Exception as e:
                 logging.error(f"Redis缓存删除错误: {str(e)}")
@@ -174,11 +283,21 @@ class CacheManager:
         redis_cleared = 0
         if self._redis:
             try:
-                # 查找匹配的键
-                keys = await run_in_threadpool(self._redis.keys, f"{pattern}*")
-                if keys:
-                    # 批量删除
-                    redis_cleared = await run_in_threadpool(self._redis.delete, *keys)
+                # 使用SCAN增量遍历匹配的键，避免KEYS阻塞Redis服务器
+                pipe = self._redis.pipeline(transaction=False)
+                batch: List[bytes] = []
+                async for key in self._redis.scan_iter(
+                    match=f"{pattern}*", count=_CLEAR_BATCH_SIZE
+                ):
+                    batch.append(key)
+                    if len(batch) >= _CLEAR_BATCH_SIZE:
+                        # UNLINK在Redis后台线程中释放内存
+                        pipe.unlink(*batch)
+                        redis_cleared += sum(await pipe.execute())
+                        batch = []
+                if batch:
+                    pipe.unlink(*batch)
+                    redis_cleared += sum(await pipe.execute())
             except Exception as e:
                 logging.error(f"Redis缓存批量删除错误: {str(e)}")
 
@@ -189,7 +308,7 @@ class CacheManager:
 cache_manager = CacheManager()
 
 
-def initialize_cache(redis_client: redis.Redis) -> None:
+def initialize_cache(redis_client: aioredis.Redis) -> None:
     """
     初始化缓存管理器
 
@@ -200,6 +319,53 @@ def initialize_cache(redis_client: redis.Redis) -> None:
     cache_manager = CacheManager(redis_client)
 
 
+def _find_request_param(func: Callable) -> Tuple[int, Optional[str]]:
+    """
+    查找函数中类型注解为Request的参数
+
+    参数:
+        func: 路由处理函数
+
+    返回:
+        Tuple[int, Optional[str]]: 参数位置和名称，未找到时名称为None
+    """
+    for index, param in enumerate(inspect.signature(func).parameters.values()):
+        if param.annotation in (Request, "Request"):
+            return index, param.name
+    return -1, None
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """
+    检查请求的If-None-Match头是否包含指定ETag
+
+    参数:
+        request: 请求对象
+        etag: 响应的ETag
+
+    返回:
+        bool: 是否匹配
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+
+def _not_modified(etag: str, headers: Dict[str, str]) -> Response:
+    """
+    构建304响应
+
+    参数:
+        etag: 响应的ETag
+        headers: HTTP缓存头
+
+    返回:
+        Response: 304响应
+    """
+    return Response(status_code=304, headers={"ETag": etag, **headers})
+
+
 def cache(
     expire: int = 300, key_prefix: str = "cache:", vary_on_headers: List[str] = None
 ):
@@ -217,43 +383,55 @@ def cache(
         Callable: 装饰器函数
     """
 
+    # 请求头名称在装饰时统一转为小写
+    headers = [header.lower() for header in vary_on_headers or ()]
+
+    # HTTP缓存头：响应随请求头变化时只允许客户端缓存，不允许共享缓存（CDN）
+    http_cache_headers = {
+        "Cache-Control": f"{'private' if headers else 'public'}, max-age={expire}"
+    }
+    if headers:
+        http_cache_headers["Vary"] = ", ".join(headers)
+
     def decorator(
         func: Callable[..., CacheableResponse]
     ) -> Callable[..., CacheableResponse]:
+        # 固定部分（前缀和路由函数）只在装饰时哈希一次，每次请求复制哈希状态
+        base_hash = hashlib.md5(
+            f"{key_prefix}\0{func.__module__}.{func.__qualname__}".encode()
+        )
+
+        # 在装饰时定位Request参数的位置和名称
+        req_idx, req_name = _find_request_param(func)
+
+        # 没有Request参数的函数无法构建缓存键，直接返回原函数
+        if req_name is None:
+            return func
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> CacheableResponse:
-            # 查找Request参数
-            request = None
-            for arg in args:
-                if isinstance(arg, Request):
-                    request = arg
-                    break
-
-            if not request:
-                for value in kwargs.values():
-                    if isinstance(value, Request):
-                        request = value
-                        break
-
-            # 如果没有找到Request参数，或者是写操作，不使用缓存
+            request = args[req_idx] if len(args) > req_idx else kwargs.get(req_name)
+
+            # 如果没有传入Request参数，或者是写操作，不使用缓存
             if not request or request.method not in ("GET", "HEAD", "OPTIONS"):
                 return await func(*args, **kwargs)
 
-            # 构建缓存键
-            key_parts = [key_prefix, request.url.path]
-
-            # 添加查询参数
-            if request.query_params:
-                key_parts.append(str(request.query_params))
+            # 构建缓存键：路径、查询参数和指定的请求头
+            key_hash = base_hash.copy()
+            key_hash.update(f"\0{request.url.path}\0{request.query_params}".encode())
+            for header in headers:
+                key_hash.update(f"\0{request.headers.get(header, '')}".encode())
 
-            # 添加指定的请求头
-            if vary_on_headers:
-                for header in vary_on_headers:
-                    if header.lower() in request.headers:
-                        key_parts.append(f"{header}:{request.headers[header.lower()]}")
+            # 保留前缀，使invalidate_cache能够按前缀清除
+            cache_key = f"{key_prefix}{key_hash.hexdigest()}"
 
-            # 生成缓存键
-            cache_key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
+            # 客户端持有的版本未变化时直接返回304，不读取缓存的响应
+            etag_key = f"{cache_key}:etag"
+            etag = cache_manager.get_memory(etag_key)
+            if etag is not None and _etag_matches(request, etag):
+                return cast(
+                    CacheableResponse, _not_modified(etag, http_cache_headers)
+                )
 
             # 尝试从缓存获取
             cached_response = await cache_manager.get(cache_key)
@@ -262,15 +440,29 @@ def cache(
                 response = cached_response
                 # 添加缓存标识头
                 if isinstance(response, Response):
+                    etag = response.headers.get("etag")
+                    if etag:
+                        cache_manager.set_memory(etag_key, etag, expire)
+                        if _etag_matches(request, etag):
+                            return cast(
+                                CacheableResponse,
+                                _not_modified(etag, http_cache_headers),
+                            )
                     response.headers["X-Cache"] = "HIT"
                 return cast(CacheableResponse, response)
 
             # 执行原始处理函数
             response = await func(*args, **kwargs)
 
-            # 如果是Response对象，添加缓存标识头
+            # 如果是Response对象，添加缓存标识头和HTTP缓存头
             if isinstance(response, Response):
                 response.headers["X-Cache"] = "MISS"
+                body = getattr(response, "body", None)
+                if body is not None:
+                    etag = f'"{hashlib.md5(body).hexdigest()}"'
+                    response.headers["ETag"] = etag
+                    response.headers.update(http_cache_headers)
+                    cache_manager.set_memory(etag_key, etag, expire)
 
             # 缓存响应
             await cache_manager.set(cache_key, response, expire)
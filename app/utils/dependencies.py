@@ -8,37 +8,73 @@
 这些依赖项可通过FastAPI的依赖注入系统使用。
 """
 
-import redis
+import socket
+import threading
+
+import redis.asyncio as aioredis
 from fastapi import Depends
 
 from app.core.config import settings
 
 
-# Redis连接池
+# Redis连接池和共享的客户端实例
 _redis_pool = None
+_redis_client = None
+_redis_lock = threading.Lock()
+
+# TCP保活参数：空闲60秒后开始探测，每10秒一次，连续3次失败断开
+_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)
+}
 
 
-def get_redis_client() -> redis.Redis:
+def get_redis_client() -> aioredis.Redis:
     """
-    获取Redis客户端实例
+    获取异步Redis客户端实例
 
-    使用连接池管理Redis连接，提高性能。
+    使用连接池管理Redis连接，客户端直接在事件循环中读写套接字，无需线程池。
+    客户端只创建一次，后续调用返回同一实例。连接池用尽时短暂等待空闲连接，
+    而不是立即报错。
 
     返回:
-        redis.Redis: Redis客户端实例
+        aioredis.Redis: 异步Redis客户端实例
     """
-    global _redis_pool
-
-    # 如果连接池不存在，创建一个新的
-    if _redis_pool is None:
-        _redis_pool = redis.ConnectionPool.from_url(
-            settings.REDIS_URL,
-            decode_responses=False,
-            max_connections=10,
-            socket_timeout=5,
-            socket_connect_timeout=5,
-            health_check_interval=30,
-        )
-
-    # 从连接池获取连接
-    return redis.Redis(connection_pool=_redis_pool)
+    global _redis_pool, _redis_client
+
+    if _redis_client is not None:
+        return _redis_client
+
+    with _redis_lock:
+        # 如果客户端不存在，创建连接池和客户端
+        if _redis_client is None:
+            _redis_pool = aioredis.BlockingConnectionPool.from_url(
+                settings.REDIS_URL,
+                decode_responses=False,
+                max_connections=settings.REDIS_POOL_SIZE,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+                socket_keepalive=True,
+                socket_keepalive_options=_KEEPALIVE_OPTIONS,
+                retry_on_timeout=True,
+                health_check_interval=30,
+            )
+            _redis_client = aioredis.Redis(connection_pool=_redis_pool)
+
+    return _redis_client
+
+
+async def close_redis_pool() -> None:
+    """
+    关闭Redis连接池
+
+    在应用关闭时调用，断开连接池中的所有连接。
+    """
+    global _redis_pool, _redis_client
+
+    if _redis_pool is not None:
+        await _redis_pool.disconnect()
+        _redis_pool = None
+        _redis_client = None
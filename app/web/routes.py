@@ -10,89 +10,113 @@ Web路由处理模块
 
 import os
 from pathlib import Path
+from typing import Dict, Tuple
+
+from jinja2 import Template
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 
 # 创建路由
 web_router = APIRouter()
 
 # 设置模板目录
 templates_path = Path(__file__).parent.parent / "templates"
-templates = Jinja2Templates(directory=str(templates_path))
+# 关闭auto_reload，渲染时不再检查模板文件的修改时间；cache_size=-1表示编译结果永不淘汰
+templates = Jinja2Templates(
+    directory=str(templates_path), auto_reload=False, cache_size=-1
+)
 
+# 模板名称 -> 已编译模板，首次使用（或启动预编译）后直接查表
+_TEMPLATES: Dict[str, Template] = {}
 
-# 创建获取CSRF令牌的辅助函数
-def get_csrf_context(request: Request):
-    """
-    获取CSRF令牌上下文
+# 页面数据由前端通过API异步加载，HTML外壳只依赖标题和站点根地址（url_for生成的
+# 静态资源地址），CSRF令牌由前端从cookie读取。外壳渲染一次后缓存为字节串，
+# 之后每次请求直接返回，不再执行模板渲染
+# (模板名称, 标题, 站点根地址) -> 渲染结果
+_RENDERED: Dict[Tuple[str, str, str], bytes] = {}
+# 站点根地址来自请求的Host头，限制缓存条目数量
+_MAX_RENDERED_PAGES = 256
+# 外壳对所有用户相同，但首次访问的响应会带上CSRF令牌Cookie，
+# 只允许浏览器缓存，避免共享代理把同一个令牌分发给所有用户
+PAGE_CACHE_HEADERS = {"Cache-Control": "private, max-age=300"}
 
-    参数:
-        request: 请求对象
 
-    返回:
-        dict: 包含CSRF令牌的字典
+def warm_templates() -> int:
     """
-    csrf_token = getattr(request.state, "csrf_token", "")
-    return {"csrf_token": csrf_token}
+    预编译所有模板
 
-
-@web_router.get("/", response_class=HTMLResponse)
-async def index(request: Request):
-    """
-    渲染首页
-
-    参数:
-        request: 请求对象
+    在应用启动时调用，避免每个工作进程首次访问页面时编译模板。
 
     返回:
-        HTMLResponse: 渲染后的HTML页面
+        int: 预编译的模板数量
     """
-    context = {"request": request, "title": "AI模型管理平台"}
-    context.update(get_csrf_context(request))
-    return templates.TemplateResponse("index.html", context)
+    names = templates.env.list_templates()
+    for name in names:
+        _TEMPLATES[name] = templates.get_template(name)
+    return len(names)
 
 
-@web_router.get("/login", response_class=HTMLResponse)
-async def login(request: Request):
+async def render_page(name: str, request: Request, title: str) -> HTMLResponse:
     """
-    渲染登录页面或重定向到静态HTML登录页
+    渲染页面
+
+    同一页面只在首次访问时渲染，之后直接返回缓存的HTML。
+    首次渲染是CPU密集的模板执行，放到线程池中进行，避免阻塞事件循环。
 
     参数:
+        name: 模板名称
         request: 请求对象
+        title: 页面标题
 
     返回:
-        HTMLResponse或RedirectResponse: 渲染后的HTML页面或重定向响应
+        HTMLResponse: 渲染后的HTML页面
     """
-    # 重定向到静态HTML登录页
-    return RedirectResponse(url="/static/html/login.html")
+    key = (name, title, str(request.base_url))
+    body = _RENDERED.get(key)
+    if body is None:
+        template = _TEMPLATES.get(name)
+        if template is None:
+            template = _TEMPLATES[name] = templates.get_template(name)
+        html = await run_in_threadpool(template.render, request=request, title=title)
+        body = html.encode("utf-8")
+        if len(_RENDERED) < _MAX_RENDERED_PAGES:
+            _RENDERED[key] = body
 
-    # 以下代码注释掉，不再使用模板渲染
-    # return templates.TemplateResponse(
-    #     "login.html",
-    #     {"request": request, "title": "登录"}
-    # )
+    return HTMLResponse(body, headers=PAGE_CACHE_HEADERS)
 
 
-@web_router.get("/register", response_class=HTMLResponse)
-async def register(request: Request):
+@web_router.get("/", response_class=HTMLResponse)
+async def index(request: Request):
     """
-    渲染注册页面或重定向到静态HTML注册页
+    渲染首页
 
     参数:
         request: 请求对象
 
     返回:
-        HTMLResponse或RedirectResponse: 渲染后的HTML页面或重定向响应
+        HTMLResponse: 渲染后的HTML页面
     """
-    # 重定向到静态HTML注册页
-    return RedirectResponse(url="/static/html/register.html")
+    return await render_page("index.html", request, "AI模型管理平台")
+
 
-    # 以下代码注释掉，不再使用模板渲染
-    # return templates.TemplateResponse(
-    #     "register.html",
-    #     {"request": request, "title": "注册"}
-    # )
+# 登录和注册页面已改为静态HTML页面，直接挂载预先构建的永久重定向响应，
+# 无需每次请求执行处理函数（部署在nginx之后时由nginx直接返回重定向）
+web_router.add_route(
+    "/login",
+    RedirectResponse(url="/static/html/login.html", status_code=308),
+    methods=["GET"],
+    name="login",
+    include_in_schema=False,
+)
+web_router.add_route(
+    "/register",
+    RedirectResponse(url="/static/html/register.html", status_code=308),
+    methods=["GET"],
+    name="register",
+    include_in_schema=False,
+)
 
 
 @web_router.get("/dashboard", response_class=HTMLResponse)
@@ -106,9 +130,7 @@ async def dashboard(request: Request):
     返回:
         HTMLResponse: 渲染后的HTML页面
     """
-    context = {"request": request, "title": "仪表盘"}
-    context.update(get_csrf_context(request))
-    return templates.TemplateResponse("dashboard.html", context)
+    return await render_page("dashboard.html", request, "仪表盘")
 
 
 @web_router.get("/models", response_class=HTMLResponse)
@@ -122,9 +144,7 @@ async def models(request: Request):
     返回:
         HTMLResponse: 渲染后的HTML页面
     """
-    context = {"request": request, "title": "模型管理"}
-    context.update(get_csrf_context(request))
-    return templates.TemplateResponse("models.html", context)
+    return await render_page("models.html", request, "模型管理")
 
 
 @web_router.get("/api-keys", response_class=HTMLResponse)
@@ -138,9 +158,7 @@ async def api_keys(request: Request):
     返回:
         HTMLResponse: 渲染后的HTML页面
     """
-    context = {"request": request, "title": "API密钥管理"}
-    context.update(get_csrf_context(request))
-    return templates.TemplateResponse("api_keys.html", context)
+    return await render_page("api_keys.html", request, "API密钥管理")
 
 
 @web_router.get("/profile", response_class=HTMLResponse)
@@ -154,6 +172,4 @@ async def profile(request: Request):
     返回:
         HTMLResponse: 渲染后的HTML页面
     """
-    context = {"request": request, "title": "个人资料"}
-    context.update(get_csrf_context(request))
-    return templates.TemplateResponse("profile.html", context)
+    return await render_page("profile.html", request, "个人资料")
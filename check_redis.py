@@ -10,46 +10,78 @@ Redis连接检查脚本
 import os
 import sys
 import time
-from datetime import datetime
+import asyncio
+import inspect
 
 
 def log(message, level="INFO"):
-    """打印带有时间戳和日志级别的消息"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level}] {message}")
+    """打印带有时间戳和日志级别的消息（整行一次写出，多线程输出不会交错）"""
+    sys.stdout.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [{level}] {message}\n")
+    if level != "INFO":
+        sys.stdout.flush()
 
 
-def check_redis_with_redis_py():
+# redis-py检查使用的连接池，首次使用时创建
+_POOL = None
+
+
+def get_redis_pool():
+    """
+    获取redis-py检查使用的连接池（模块级单例）
+
+    设置了REDIS_UNIX_SOCKET时通过Unix套接字连接本机Redis，否则使用TCP连接
+    """
+    global _POOL
+    if _POOL is None:
+        import redis.asyncio as aioredis
+        
+        # 从环境变量或配置文件获取Redis连接信息
+        options = dict(
+            password=os.environ.get("REDIS_PASSWORD", "") or None,
+            db=int(os.environ.get("REDIS_DB", 0)),
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            max_connections=8,
+        )
+        unix_socket_path = os.environ.get("REDIS_UNIX_SOCKET")
+        if unix_socket_path:
+            options.update(
+                connection_class=aioredis.UnixDomainSocketConnection,
+                path=unix_socket_path,
+            )
+            options.pop("socket_connect_timeout")
+        else:
+            options.update(
+                host=os.environ.get("REDIS_HOST", "localhost"),
+                port=int(os.environ.get("REDIS_PORT", 6379)),
+            )
+        _POOL = aioredis.ConnectionPool(**options)
+    return _POOL
+
+
+async def check_redis_with_redis_py():
     """使用redis-py库检查Redis连接"""
     try:
-        import redis
+        import redis.asyncio as aioredis
         log("使用redis-py检查Redis连接...")
         
-        # 从环境变量或配置文件获取Redis连接信息
-        redis_host = os.environ.get("REDIS_HOST", "localhost")
-        redis_port = int(os.environ.get("REDIS_PORT", 6379))
-        redis_password = os.environ.get("REDIS_PASSWORD", "")
-        redis_db = int(os.environ.get("REDIS_DB", 0))
-        
-        # 创建Redis客户端
-        client = redis.Redis(
-            host=redis_host,
-            port=redis_port,
-            password=redis_password,
-            db=redis_db,
-            socket_timeout=5,
-            socket_connect_timeout=5
+        # 客户端共享连接池，关闭客户端不会断开池中的连接
+        pool = get_redis_pool()
+        client = aioredis.Redis(connection_pool=pool)
+        target = pool.connection_kwargs.get("path") or (
+            f"{pool.connection_kwargs['host']}:{pool.connection_kwargs['port']}"
         )
         
         # 检查连接
-        if client.ping():
-            log(f"Redis连接成功: {redis_host}:{redis_port}/{redis_db}")
-            client.close()
-            return True
-        else:
-            log(f"Redis连接失败，无法执行PING命令", "ERROR")
-            client.close()
-            return False
+        try:
+            if await client.ping():
+                log(f"Redis连接成功: {target}/{pool.connection_kwargs['db']}")
+                return True
+            else:
+                log(f"Redis连接失败，无法执行PING命令", "ERROR")
+                return False
+        finally:
+            await client.aclose()
             
     except ImportError:
         log("未安装redis-py库，跳过此方法检查", "WARNING")
@@ -59,91 +91,116 @@ def check_redis_with_redis_py():
         return False
 
 
-def check_redis_with_socket():
-    """使用socket库直接检查Redis端口是否开放"""
+# RESP格式的PING命令
+PING_COMMAND = b"*1\r\n$4\r\nPING\r\n"
+
+
+async def check_redis_with_socket(timeout=5):
+    """
+    使用socket直接检查Redis端口是否开放，并在同一连接上发送PING确认对端使用Redis协议
+
+    返回{"socket": 端口是否开放, "protocol": 是否返回Redis协议应答}，端口未开放时协议检查跳过
+    """
+    results = {"socket": False, "protocol": None}
     try:
-        import socket
         log("使用socket检查Redis端口...")
         
         redis_host = os.environ.get("REDIS_HOST", "localhost")
         redis_port = int(os.environ.get("REDIS_PORT", 6379))
         
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(redis_host, redis_port), timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            log(f"Redis端口{redis_port}未开放", "ERROR")
+            return results
+        
+        results["socket"] = True
+        log(f"Redis端口{redis_port}开放")
         
-        result = sock.connect_ex((redis_host, redis_port))
-        sock.close()
+        try:
+            writer.write(PING_COMMAND)
+            await writer.drain()
+            reply = await asyncio.wait_for(reader.readline(), timeout)
+        finally:
+            writer.close()
+            await writer.wait_closed()
         
-        if result == 0:
-            log(f"Redis端口{redis_port}开放")
-            return True
+        # +PONG为正常应答；设置了密码时返回-NOAUTH等错误应答，同样说明对端是Redis
+        if reply.startswith(b"+PONG"):
+            log(f"Redis协议应答正常: {redis_host}:{redis_port}")
+            results["protocol"] = True
+        elif reply.startswith(b"-"):
+            log(f"Redis返回错误应答: {reply.decode(errors='replace').strip()}", "WARNING")
+            results["protocol"] = True
         else:
-            log(f"Redis端口{redis_port}未开放", "ERROR")
-            return False
+            log(f"端口{redis_port}上的服务未返回Redis协议应答", "ERROR")
+            results["protocol"] = False
+        return results
             
     except Exception as e:
         log(f"检查Redis端口时出错: {str(e)}", "ERROR")
-        return False
-
+        return results
 
-def check_redis_with_telnet():
-    """使用telnetlib检查Redis连接"""
-    try:
-        import telnetlib
-        log("使用telnet检查Redis连接...")
-        
-        redis_host = os.environ.get("REDIS_HOST", "localhost")
-        redis_port = int(os.environ.get("REDIS_PORT", 6379))
-        
-        tn = telnetlib.Telnet(redis_host, redis_port, timeout=5)
-        tn.close()
-        
-        log(f"Telnet连接Redis成功: {redis_host}:{redis_port}")
-        return True
-    except ImportError:
-        log("未安装telnetlib库，跳过此方法检查", "WARNING")
-        return None
-    except Exception as e:
-        log(f"Telnet连接Redis失败: {str(e)}", "ERROR")
-        return False
 
+async def check_redis_for_celery(existing_client=None):
+    """
+    检查Celery配置的Redis连接
 
-def check_redis_for_celery():
-    """检查Celery配置的Redis连接"""
-    try:
-        from celery.backends.redis import RedisBackend
-        from celery.app.backends import get_backend_by_url
-        
-        log("检查Celery配置的Redis连接...")
-        
-        # 获取Celery配置的Redis URL
-        broker_url = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
-        result_backend = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
-        
-        log(f"Celery Broker URL: {broker_url}")
-        log(f"Celery Result Backend: {result_backend}")
-        
-        # 尝试初始化后端连接
-        if "redis" in result_backend:
-            backend = get_backend_by_url(result_backend)
-            if isinstance(backend, RedisBackend):
-                client = backend.client
-                if client.ping():
-                    log("Celery Redis后端连接成功")
-                    return True
-                else:
-                    log("Celery Redis后端连接失败", "ERROR")
-                    return False
-        
+    传入应用已有的Redis客户端时直接复用其连接池执行PING；
+    作为独立脚本运行时按Celery结果后端URL临时创建客户端，检查后断开连接池释放连接。
+    
+    参数:
+        existing_client: 已有的Redis客户端（同步或asyncio客户端均可），可选
+    """
+    log("检查Celery配置的Redis连接...")
+    
+    if existing_client is not None:
+        try:
+            result = existing_client.ping()
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            log(f"检查Celery Redis连接时出错: {str(e)}", "ERROR")
+            return False
+        if result:
+            log("Celery Redis后端连接成功")
+            return True
+        log("Celery Redis后端连接失败", "ERROR")
+        return False
+    
+    # 获取Celery配置的Redis URL
+    broker_url = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    result_backend = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+    
+    log(f"Celery Broker URL: {broker_url}")
+    log(f"Celery Result Backend: {result_backend}")
+    
+    if not result_backend.startswith(("redis://", "rediss://", "unix://")):
         log("Celery未使用Redis作为后端或无法验证连接", "WARNING")
         return None
-        
+    
+    try:
+        import redis.asyncio as aioredis
     except ImportError:
-        log("未安装celery库，跳过此方法检查", "WARNING")
+        log("未安装redis库，跳过此方法检查", "WARNING")
         return None
+    
+    client = aioredis.Redis.from_url(
+        result_backend, socket_timeout=5, socket_connect_timeout=5
+    )
+    try:
+        if await client.ping():
+            log("Celery Redis后端连接成功")
+            return True
+        log("Celery Redis后端连接失败", "ERROR")
+        return False
     except Exception as e:
         log(f"检查Celery Redis连接时出错: {str(e)}", "ERROR")
         return False
+    finally:
+        await client.connection_pool.disconnect()
 
 
 def suggest_redis_installation():
@@ -179,6 +236,26 @@ def suggest_redis_installation():
     print("="*60)
 
 
+async def run_checks(methods):
+    """
+    并发执行所有检查方法，返回(名称, 结果)列表
+
+    检查方法返回字典时，每一项作为一条单独的检查结果
+    """
+    async def run(name, check):
+        try:
+            result = await check()
+        except Exception as e:
+            log(f"{name}检查方法出错: {str(e)}", "ERROR")
+            return [(name, False)]
+        if isinstance(result, dict):
+            return list(result.items())
+        return [(name, result)]
+    
+    results = await asyncio.gather(*(run(name, check) for name, check in methods))
+    return [item for items in results for item in items]
+
+
 def main():
     """主函数"""
     log("开始检查Redis连接...")
@@ -191,24 +268,14 @@ def main():
     except ImportError:
         log("未安装python-dotenv库，无法加载.env文件", "WARNING")
     
+    # 各检查方法相互独立，并发执行，总耗时取决于最慢的一项
     methods = [
         ("redis-py", check_redis_with_redis_py),
         ("socket", check_redis_with_socket),
-        ("telnet", check_redis_with_telnet),
         ("celery", check_redis_for_celery)
     ]
     
-    results = []
-    for name, check_func in methods:
-        try:
-            result = check_func()
-            results.append((name, result))
-        except Exception as e:
-            log(f"{name}检查方法出错: {str(e)}", "ERROR")
-            results.append((name, False))
-        
-        # 短暂延迟，避免连续请求
-        time.sleep(0.5)
+    results = asyncio.run(run_checks(methods))
     
     # 结果汇总
     print("\n" + "="*60)
@@ -10,96 +10,22 @@
 
 import os
 import sys
-import subprocess
 import argparse
-import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+from requirements_utils import load_requirements, trusted_host_for
+from script_utils import (
+    check_pip,
+    check_python_version,
+    log_message,
+    run_command_streaming,
+    run_command_with_backoff,
+)
 
-def log_message(message, level="INFO"):
-    """打印带有时间戳和日志级别的消息"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level}] {message}")
 
-
-def run_command(command, timeout=None):
-    """
-    运行命令并返回结果
-    
-    参数:
-        command: 要执行的命令（字符串或列表）
-        timeout: 超时时间（秒）
-        
-    返回:
-        (returncode, stdout, stderr): 命令执行的返回代码、标准输出和标准错误
-    """
-    try:
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            shell=isinstance(command, str),
-            text=True
-        )
-        
-        stdout, stderr = process.communicate(timeout=timeout)
-        return process.returncode, stdout, stderr
-    except subprocess.TimeoutExpired:
-        process.kill()
-        return 1, "", "命令执行超时"
-    except Exception as e:
-        return 1, "", f"命令执行出错: {str(e)}"
-
-
-def check_pip():
-    """检查pip是否可用，返回可用的pip命令（pip或pip3）"""
-    commands = ["pip", "pip3"]
-    
-    for cmd in commands:
-        returncode, stdout, _ = run_command([cmd, "--version"])
-        if returncode == 0:
-            log_message(f"找到可用的pip: {stdout.strip()}")
-            return cmd
-    
-    log_message("未找到可用的pip，请先安装pip", "ERROR")
-    return None
-
-
-def check_python_version():
-    """检查Python版本是否满足要求"""
-    version_info = sys.version_info
-    if version_info.major < 3 or (version_info.major == 3 and version_info.minor < 8):
-        log_message(f"Python版本 {sys.version} 过低，需要 Python 3.8 或更高版本", "ERROR")
-        return False
-    
-    log_message(f"Python版本检查通过: {sys.version}")
-    return True
-
-
-def parse_requirements(requirements_file):
-    """
-    解析requirements.txt文件
-    
-    参数:
-        requirements_file: requirements.txt文件路径
-        
-    返回:
-        list: 有效的依赖包列表
-    """
-    try:
-        with open(requirements_file, "r") as f:
-            lines = f.readlines()
-        
-        packages = []
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith("#"):
-                packages.append(line)
-        
-        return packages
-    except Exception as e:
-        log_message(f"解析requirements.txt出错: {str(e)}", "ERROR")
-        return []
+# 逐个下载时的并发数
+DOWNLOAD_WORKERS = 8
 
 
 def download_packages(pip_command, packages, output_dir, index_url=None, trusted_host=None):
@@ -127,13 +53,8 @@ def download_packages(pip_command, packages, output_dir, index_url=None, trusted
             log_message(f"创建输出目录失败: {str(e)}", "ERROR")
             return [], packages
     
-    succeeded = []
-    failed = []
-    
-    for package in packages:
-        log_message(f"下载包: {package}")
-        
-        cmd = [pip_command, "download", package, "-d", output_dir]
+    def build_command(targets):
+        cmd = [pip_command, "download", *targets, "-d", output_dir]
         
         if index_url:
             cmd.extend(["-i", index_url])
@@ -141,22 +62,135 @@ def download_packages(pip_command, packages, output_dir, index_url=None, trusted
         if trusted_host:
             cmd.extend(["--trusted-host", trusted_host])
         
-        returncode, stdout, stderr = run_command(cmd, timeout=300)
-        
-        if returncode == 0:
-            succeeded.append(package)
-            log_message(f"成功下载: {package}")
-        else:
-            failed.append(package)
-            log_message(f"下载失败: {package}", "WARNING")
-            log_message(f"错误信息: {stderr}", "WARNING")
-        
-        # 短暂延迟，避免过于频繁的请求
-        time.sleep(1)
+        return cmd
+    
+    # 先用一次pip调用下载全部包，共享依赖解析和HTTP连接
+    log_message(f"批量下载 {len(packages)} 个包...")
+    returncode, output = run_command_streaming(build_command(packages), timeout=1800)
+    if returncode == 0:
+        log_message("批量下载成功")
+        return list(packages), []
+    
+    log_message("批量下载失败，改为逐个并发下载", "WARNING")
+    log_message(f"错误信息: {output}", "WARNING")
+    
+    def download_one(package):
+        log_message(f"下载包: {package}")
+        returncode, _, stderr = run_command_with_backoff(build_command([package]), timeout=300)
+        return package, returncode, stderr
+    
+    succeeded = []
+    failed = []
+    
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        for package, returncode, stderr in executor.map(download_one, packages):
+            if returncode == 0:
+                succeeded.append(package)
+                log_message(f"成功下载: {package}")
+            else:
+                failed.append(package)
+                log_message(f"下载失败: {package}", "WARNING")
+                log_message(f"错误信息: {stderr}", "WARNING")
     
     return succeeded, failed
 
 
+# 离线安装脚本内容（静态文本，模块加载时生成一次）
+BAT_SCRIPT = """\
+@echo off
+echo 开始离线安装依赖包...
+echo.
+
+:: 检查pip是否可用
+pip --version > nul 2>&1
+if %errorlevel% NEQ 0 (
+    echo 未找到pip，尝试使用pip3...
+    pip3 --version > nul 2>&1
+    if %errorlevel% NEQ 0 (
+        echo 错误: 未找到pip或pip3，请确保已安装Python并添加到PATH环境变量中
+        pause
+        exit /b 1
+    ) else (
+        set PIP_CMD=pip3
+    )
+) else (
+    set PIP_CMD=pip
+)
+
+echo 使用 %PIP_CMD% 安装依赖...
+echo.
+
+:: 有requirements.txt时由pip一次性解析依赖并按正确顺序安装，否则逐个安装包文件
+if exist requirements.txt (
+    %PIP_CMD% install --no-index --find-links . --prefer-binary -r requirements.txt
+    if errorlevel 1 (
+        echo 警告: 部分依赖安装失败
+    ) else (
+        echo 成功安装所有依赖
+    )
+) else (
+    for %%f in (*.whl *.tar.gz *.zip) do (
+        echo 安装: %%f
+        %PIP_CMD% install "%%f"
+        if errorlevel 1 (
+            echo 警告: 安装 %%f 失败
+        ) else (
+            echo 成功安装: %%f
+        )
+    )
+)
+
+echo.
+echo 安装过程已完成。
+pause
+"""
+
+SH_SCRIPT = """\
+#!/bin/bash
+
+echo '开始离线安装依赖包...'
+echo
+
+# 检查pip是否可用
+if command -v pip >/dev/null 2>&1; then
+    PIP_CMD=pip
+elif command -v pip3 >/dev/null 2>&1; then
+    PIP_CMD=pip3
+else
+    echo '错误: 未找到pip或pip3，请确保已安装Python'
+    exit 1
+fi
+
+echo "使用 $PIP_CMD 安装依赖..."
+echo
+
+# 有requirements.txt时由pip一次性解析依赖并按正确顺序安装，否则逐个安装包文件
+if [ -f requirements.txt ]; then
+    if "$PIP_CMD" install --no-index --find-links . --prefer-binary -r requirements.txt; then
+        echo "成功安装所有依赖"
+    else
+        echo "警告: 部分依赖安装失败"
+    fi
+else
+    for pkg in *.whl *.tar.gz *.zip; do
+        # 跳过未匹配到文件的通配符
+        [ -e "$pkg" ] || continue
+
+        echo "安装: $pkg"
+        "$PIP_CMD" install "$pkg"
+        if [ $? -ne 0 ]; then
+            echo "警告: 安装 $pkg 失败"
+        else
+            echo "成功安装: $pkg"
+        fi
+    done
+fi
+
+echo
+echo '安装过程已完成。'
+"""
+
+
 def create_offline_install_script(output_dir, bat_file=True, sh_file=True):
     """
     创建离线安装脚本
@@ -167,83 +201,53 @@ def create_offline_install_script(output_dir, bat_file=True, sh_file=True):
         sh_file: 是否创建Linux/Mac shell脚本
     """
     if bat_file:
-        bat_path = os.path.join(output_dir, "install_offline.bat")
-        with open(bat_path, "w") as f:
-            f.write("@echo off\n")
-            f.write("echo 开始离线安装依赖包...\n")
-            f.write("echo.\n\n")
-            f.write(":: 检查pip是否可用\n")
-            f.write("pip --version > nul 2>&1\n")
-            f.write("if %errorlevel% NEQ 0 (\n")
-            f.write("    echo 未找到pip，尝试使用pip3...\n")
-            f.write("    pip3 --version > nul 2>&1\n")
-            f.write("    if %errorlevel% NEQ 0 (\n")
-            f.write("        echo 错误: 未找到pip或pip3，请确保已安装Python并添加到PATH环境变量中\n")
-            f.write("        pause\n")
-            f.write("        exit /b 1\n")
-            f.write("    ) else (\n")
-            f.write("        set PIP_CMD=pip3\n")
-            f.write("    )\n")
-            f.write(") else (\n")
-            f.write("    set PIP_CMD=pip\n")
-            f.write(")\n\n")
-            f.write("echo 使用 %PIP_CMD% 安装依赖...\n")
-            f.write("echo.\n\n")
-            f.write("for %%f in (*.whl *.tar.gz *.zip) do (\n")
-            f.write("    echo 安装: %%f\n")
-            f.write("    %PIP_CMD% install \"%%f\"\n")
-            f.write("    if %errorlevel% NEQ 0 (\n")
-            f.write("        echo 警告: 安装 %%f 失败\n")
-            f.write("    ) else (\n")
-            f.write("        echo 成功安装: %%f\n")
-            f.write("    )\n")
-            f.write(")\n\n")
-            f.write("echo.\n")
-            f.write("echo 安装过程已完成。\n")
-            f.write("pause\n")
+        bat_path = Path(output_dir) / "install_offline.bat"
+        bat_path.write_text(BAT_SCRIPT)
         
         log_message(f"创建Windows离线安装脚本: {bat_path}")
     
     if sh_file:
-        sh_path = os.path.join(output_dir, "install_offline.sh")
-        with open(sh_path, "w") as f:
-            f.write("#!/bin/bash\n\n")
-            f.write("echo '开始离线安装依赖包...'\n")
-            f.write("echo\n\n")
-            f.write("# 检查pip是否可用\n")
-            f.write("if command -v pip >/dev/null 2>&1; then\n")
-            f.write("    PIP_CMD=pip\n")
-            f.write("elif command -v pip3 >/dev/null 2>&1; then\n")
-            f.write("    PIP_CMD=pip3\n")
-            f.write("else\n")
-            f.write("    echo '错误: 未找到pip或pip3，请确保已安装Python'\n")
-            f.write("    exit 1\n")
-            f.write("fi\n\n")
-            f.write("echo \"使用 $PIP_CMD 安装依赖...\"\n")
-            f.write("echo\n\n")
-            f.write("for pkg in *.whl *.tar.gz *.zip; do\n")
-            f.write("    # 跳过未匹配到文件的通配符\n")
-            f.write("    [ -e \"$pkg\" ] || continue\n\n")
-            f.write("    echo \"安装: $pkg\"\n")
-            f.write("    \"$PIP_CMD\" install \"$pkg\"\n")
-            f.write("    if [ $? -ne 0 ]; then\n")
-            f.write("        echo \"警告: 安装 $pkg 失败\"\n")
-            f.write("    else\n")
-            f.write("        echo \"成功安装: $pkg\"\n")
-            f.write("    fi\n")
-            f.write("done\n\n")
-            f.write("echo\n")
-            f.write("echo '安装过程已完成。'\n")
+        sh_path = Path(output_dir) / "install_offline.sh"
+        sh_path.write_text(SH_SCRIPT)
         
         # 设置shell脚本的执行权限
         try:
-            os.chmod(sh_path, 0o755)
+            sh_path.chmod(0o755)
         except:
             log_message("无法设置shell脚本的执行权限", "WARNING")
         
         log_message(f"创建Linux/Mac离线安装脚本: {sh_path}")
 
 
+# README模板，依赖包列表部分在生成时填入
+README_TEMPLATE = """\
+# Python后端项目离线依赖包
+
+此目录包含Python后端项目所需的依赖包，用于在网络受限环境中安装。
+
+## 使用方法
+
+### Windows
+
+1. 双击运行`install_offline.bat`
+
+### Linux/Mac
+
+1. 打开终端，进入此目录
+2. 执行命令: `bash install_offline.sh`或`./install_offline.sh`
+
+## 包含的依赖包
+
+总计下载成功: {succeeded_count} 个包
+
+{package_sections}## 注意事项
+
+1. 这些包是为特定版本的Python下载的，请确保您使用的Python版本与下载时使用的版本相同或兼容
+2. 下载时使用的Python版本: {python_version}
+3. 如果安装过程中遇到问题，您可能需要手动安装依赖关系
+"""
+
+
 def create_readme(output_dir, succeeded, failed):
     """
     创建README文件
@@ -253,39 +257,24 @@ def create_readme(output_dir, succeeded, failed):
         succeeded: 成功下载的包列表
         failed: 下载失败的包列表
     """
-    readme_path = os.path.join(output_dir, "README.md")
-    with open(readme_path, "w") as f:
-        f.write("# Python后端项目离线依赖包\n\n")
-        f.write("此目录包含Python后端项目所需的依赖包，用于在网络受限环境中安装。\n\n")
-        
-        f.write("## 使用方法\n\n")
-        f.write("### Windows\n\n")
-        f.write("1. 双击运行`install_offline.bat`\n\n")
-        
-        f.write("### Linux/Mac\n\n")
-        f.write("1. 打开终端，进入此目录\n")
-        f.write("2. 执行命令: `bash install_offline.sh`或`./install_offline.sh`\n\n")
-        
-        f.write("## 包含的依赖包\n\n")
-        f.write(f"总计下载成功: {len(succeeded)} 个包\n\n")
-        
-        if succeeded:
-            f.write("### 成功下载的包\n\n")
-            for package in succeeded:
-                f.write(f"- {package}\n")
-            f.write("\n")
-        
-        if failed:
-            f.write("### 下载失败的包\n\n")
-            f.write("以下包下载失败，您可能需要手动安装:\n\n")
-            for package in failed:
-                f.write(f"- {package}\n")
-            f.write("\n")
-        
-        f.write("## 注意事项\n\n")
-        f.write("1. 这些包是为特定版本的Python下载的，请确保您使用的Python版本与下载时使用的版本相同或兼容\n")
-        f.write(f"2. 下载时使用的Python版本: {sys.version}\n")
-        f.write("3. 如果安装过程中遇到问题，您可能需要手动安装依赖关系\n")
+    def package_list(packages):
+        return "".join(f"- {package}\n" for package in packages)
+    
+    sections = []
+    if succeeded:
+        sections.append(f"### 成功下载的包\n\n{package_list(succeeded)}\n")
+    if failed:
+        sections.append(
+            "### 下载失败的包\n\n"
+            f"以下包下载失败，您可能需要手动安装:\n\n{package_list(failed)}\n"
+        )
+    
+    readme_path = Path(output_dir) / "README.md"
+    readme_path.write_text(README_TEMPLATE.format(
+        succeeded_count=len(succeeded),
+        package_sections="".join(sections),
+        python_version=sys.version,
+    ))
     
     log_message(f"创建README文件: {readme_path}")
 
@@ -324,7 +313,11 @@ def main():
         sys.exit(1)
     
     # 解析requirements.txt
-    packages = parse_requirements(args.requirements)
+    try:
+        packages = load_requirements(args.requirements)
+    except Exception as e:
+        log_message(f"解析requirements.txt出错: {str(e)}", "ERROR")
+        packages = []
     if not packages:
         log_message("未找到有效的依赖包", "ERROR")
         sys.exit(1)
@@ -332,11 +325,7 @@ def main():
     log_message(f"从{args.requirements}解析出{len(packages)}个依赖包")
     
     # 从镜像URL提取主机名
-    trusted_host = None
-    if args.index_url:
-        import re
-        host_match = re.search(r"https?://([^/]+)", args.index_url)
-        trusted_host = host_match.group(1) if host_match else None
+    trusted_host = trusted_host_for(args.index_url)
     
     # 下载包
     succeeded, failed = download_packages(
@@ -347,6 +336,10 @@ def main():
         trusted_host
     )
     
+    # 保存下载成功的依赖列表，离线安装时由pip一次性解析安装
+    if succeeded:
+        Path(args.output_dir, "requirements.txt").write_text("\n".join(succeeded) + "\n")
+    
     # 创建离线安装脚本
     create_offline_install_script(args.output_dir)
     
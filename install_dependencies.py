@@ -10,70 +10,35 @@
 
 import os
 import sys
-import subprocess
+import socket
 import argparse
-import time
-from datetime import datetime
-
-
-def log_message(message, level="INFO"):
-    """打印带有时间戳和日志级别的消息"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level}] {message}")
-
-
-def run_command(command, timeout=None):
-    """
-    运行命令并返回结果
-    
-    参数:
-        command: 要执行的命令（字符串或列表）
-        timeout: 超时时间（秒）
-        
-    返回:
-        (returncode, stdout, stderr): 命令执行的返回代码、标准输出和标准错误
-    """
-    try:
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            shell=isinstance(command, str),
-            text=True
-        )
-        
-        stdout, stderr = process.communicate(timeout=timeout)
-        return process.returncode, stdout, stderr
-    except subprocess.TimeoutExpired:
-        process.kill()
-        return 1, "", "命令执行超时"
-    except Exception as e:
-        return 1, "", f"命令执行出错: {str(e)}"
-
-
-def check_pip():
-    """检查pip是否可用，返回可用的pip命令（pip或pip3）"""
-    commands = ["pip", "pip3"]
-    
-    for cmd in commands:
-        returncode, stdout, _ = run_command([cmd, "--version"])
-        if returncode == 0:
-            log_message(f"找到可用的pip: {stdout.strip()}")
-            return cmd
-    
-    log_message("未找到可用的pip，请先安装pip", "ERROR")
-    return None
-
-
-def check_python_version():
-    """检查Python版本是否满足要求"""
-    version_info = sys.version_info
-    if version_info.major < 3 or (version_info.major == 3 and version_info.minor < 8):
-        log_message(f"Python版本 {sys.version} 过低，需要 Python 3.8 或更高版本", "ERROR")
-        return False
-    
-    log_message(f"Python版本检查通过: {sys.version}")
-    return True
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from requirements_utils import is_requirement_satisfied, load_requirements, trusted_host_for
+from script_utils import (
+    check_pip,
+    check_python_version,
+    log_message,
+    run_command_streaming,
+    run_command_with_backoff,
+)
+
+
+# pip install的公共参数：网络重试、超时，以及优先使用wheel避免源码构建
+PIP_INSTALL_OPTIONS = ["--retries", "3", "--timeout", "60", "--prefer-binary"]
+
+# 可选的镜像源：(名称, URL, 受信任主机名)，主机名由URL解析得到
+MIRRORS = [
+    (name, url, trusted_host_for(url))
+    for name, url in (
+        ("默认PyPI", None),
+        ("清华镜像", "https://pypi.tuna.tsinghua.edu.cn/simple"),
+        ("阿里云镜像", "https://mirrors.aliyun.com/pypi/simple/"),
+        ("豆瓣镜像", "https://pypi.doubanio.com/simple/"),
+        ("华为云镜像", "https://repo.huaweicloud.com/repository/pypi/simple"),
+    )
+]
 
 
 def test_network_connection():
@@ -85,15 +50,24 @@ def test_network_connection():
         "https://mirrors.aliyun.com"
     ]
     
+    def can_connect(url):
+        # pip通过HTTPS访问镜像源，检查443端口能否建立TCP连接（ICMP ping常被防火墙屏蔽）
+        try:
+            with socket.create_connection((urlparse(url).hostname, 443), timeout=3):
+                return True
+        except OSError:
+            return False
+    
     working_urls = []
     
-    for url in test_urls:
-        returncode, _, _ = run_command(f"ping {url.replace('https://', '')}", timeout=5)
-        if returncode == 0:
-            working_urls.append(url)
-            log_message(f"可以访问 {url}")
-        else:
-            log_message(f"无法访问 {url}", "WARNING")
+    # 各镜像源并发检查，总耗时约为一次连接的时间
+    with ThreadPoolExecutor(max_workers=len(test_urls)) as executor:
+        for url, reachable in zip(test_urls, executor.map(can_connect, test_urls)):
+            if reachable:
+                working_urls.append(url)
+                log_message(f"可以访问 {url}")
+            else:
+                log_message(f"无法访问 {url}", "WARNING")
     
     return working_urls
 
@@ -112,7 +86,7 @@ def install_with_pip(pip_command, requirements_file, index_url=None, trusted_hos
     返回:
         bool: 安装是否成功
     """
-    cmd = [pip_command, "install", "-r", requirements_file]
+    cmd = [pip_command, "install", "-r", requirements_file, *PIP_INSTALL_OPTIONS]
     
     if index_url:
         cmd.extend(["-i", index_url])
@@ -122,23 +96,26 @@ def install_with_pip(pip_command, requirements_file, index_url=None, trusted_hos
     
     log_message(f"执行命令: {' '.join(cmd)}")
     
-    returncode, stdout, stderr = run_command(cmd, timeout)
+    returncode, output = run_command_streaming(cmd, timeout)
     
     if returncode == 0:
         log_message("依赖安装成功!")
         return True
     else:
-        log_message(f"依赖安装失败: {stderr}", "ERROR")
+        log_message(f"依赖安装失败: {output}", "ERROR")
         return False
 
 
-def install_one_by_one(pip_command, requirements_file, index_url=None, trusted_host=None):
+def install_one_by_one(pip_command, packages, index_url=None, trusted_host=None):
     """
     逐个安装依赖，跳过失败的包
+
+    整体安装失败后调用，此前已安装成功（版本满足要求）的包不再重复安装，
+    只逐个安装仍未满足的包。
     
     参数:
         pip_command: pip命令 (pip 或 pip3)
-        requirements_file: requirements.txt文件路径
+        packages: 依赖包列表
         index_url: 指定的镜像源URL
         trusted_host: 信任的主机
     
@@ -147,29 +124,27 @@ def install_one_by_one(pip_command, requirements_file, index_url=None, trusted_h
     """
     log_message("开始逐个安装依赖...")
     
-    # 读取requirements.txt
-    with open(requirements_file, "r") as f:
-        lines = f.readlines()
-    
-    # 解析包名和版本
-    packages = []
-    for line in lines:
-        line = line.strip()
-        if line and not line.startswith("#"):
-            packages.append(line)
-    
     succeeded = []
     failed = []
     
+    pending = []
     for package in packages:
-        cmd = [pip_command, "install", package]
+        if is_requirement_satisfied(package):
+            succeeded.append(package)
+        else:
+            pending.append(package)
+    if succeeded:
+        log_message(f"已满足 {len(succeeded)} 个依赖，逐个安装其余 {len(pending)} 个")
+    
+    for package in pending:
+        cmd = [pip_command, "install", package, *PIP_INSTALL_OPTIONS]
         if index_url:
             cmd.extend(["-i", index_url])
         if trusted_host:
             cmd.extend(["--trusted-host", trusted_host])
         
         log_message(f"正在安装: {package}")
-        returncode, _, stderr = run_command(cmd, timeout=120)
+        returncode, _, stderr = run_command_with_backoff(cmd, timeout=120)
         
         if returncode == 0:
             succeeded.append(package)
@@ -177,9 +152,6 @@ def install_one_by_one(pip_command, requirements_file, index_url=None, trusted_h
         else:
             failed.append(package)
             log_message(f"安装失败: {package} - {stderr}", "WARNING")
-        
-        # 短暂延迟，避免过于频繁的请求
-        time.sleep(1)
     
     return succeeded, failed
 
@@ -207,6 +179,9 @@ def main():
         log_message(f"找不到requirements文件: {args.requirements}", "ERROR")
         sys.exit(1)
     
+    # 解析一次requirements.txt，逐个安装时复用
+    packages = load_requirements(args.requirements)
+    
     # 测试网络连接
     working_urls = []
     if not args.skip_network_test:
@@ -217,26 +192,15 @@ def main():
             if response.lower() != 'y':
                 sys.exit(1)
     
-    # 指定的镜像源
-    mirrors = [
-        ("默认PyPI", None, None),
-        ("清华镜像", "https://pypi.tuna.tsinghua.edu.cn/simple", "pypi.tuna.tsinghua.edu.cn"),
-        ("阿里云镜像", "https://mirrors.aliyun.com/pypi/simple/", "mirrors.aliyun.com"),
-        ("豆瓣镜像", "https://pypi.doubanio.com/simple/", "pypi.doubanio.com"),
-        ("华为云镜像", "https://repo.huaweicloud.com/repository/pypi/simple", "repo.huaweicloud.com")
-    ]
-    
     # 如果指定了镜像源
     if args.index_url:
         log_message(f"使用指定的镜像源: {args.index_url}")
         
         # 从URL提取主机名
-        import re
-        host_match = re.search(r"https?://([^/]+)", args.index_url)
-        trusted_host = host_match.group(1) if host_match else None
+        trusted_host = trusted_host_for(args.index_url)
         
         if args.one_by_one:
-            succeeded, failed = install_one_by_one(pip_command, args.requirements, args.index_url, trusted_host)
+            succeeded, failed = install_one_by_one(pip_command, packages, args.index_url, trusted_host)
             log_message(f"逐个安装结果: 成功 {len(succeeded)}/{len(succeeded) + len(failed)}, 失败 {len(failed)}")
             if failed:
                 log_message(f"以下包安装失败: {', '.join(failed)}", "WARNING")
@@ -244,17 +208,17 @@ def main():
             success = install_with_pip(pip_command, args.requirements, args.index_url, trusted_host)
             if not success and not args.one_by_one:
                 log_message("尝试逐个安装依赖...")
-                succeeded, failed = install_one_by_one(pip_command, args.requirements, args.index_url, trusted_host)
+                succeeded, failed = install_one_by_one(pip_command, packages, args.index_url, trusted_host)
                 log_message(f"逐个安装结果: 成功 {len(succeeded)}/{len(succeeded) + len(failed)}, 失败 {len(failed)}")
         
         sys.exit(0)
     
     # 尝试不同的镜像源
-    for mirror_name, mirror_url, trusted_host in mirrors:
+    for mirror_name, mirror_url, trusted_host in MIRRORS:
         log_message(f"尝试使用{mirror_name}安装依赖...")
         
         if args.one_by_one:
-            succeeded, failed = install_one_by_one(pip_command, args.requirements, mirror_url, trusted_host)
+            succeeded, failed = install_one_by_one(pip_command, packages, mirror_url, trusted_host)
             log_message(f"逐个安装结果: 成功 {len(succeeded)}/{len(succeeded) + len(failed)}, 失败 {len(failed)}")
             if len(failed) == 0:
                 log_message(f"使用{mirror_name}成功安装所有依赖!")
@@ -266,7 +230,7 @@ def main():
                 break
             elif not args.one_by_one:
                 log_message(f"使用{mirror_name}安装所有依赖失败，尝试逐个安装...")
-                succeeded, failed = install_one_by_one(pip_command, args.requirements, mirror_url, trusted_host)
+                succeeded, failed = install_one_by_one(pip_command, packages, mirror_url, trusted_host)
                 log_message(f"逐个安装结果: 成功 {len(succeeded)}/{len(succeeded) + len(failed)}, 失败 {len(failed)}")
                 if len(failed) == 0:
                     log_message(f"使用{mirror_name}成功安装所有依赖!")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+依赖文件解析模块
+
+供依赖安装脚本和依赖包下载脚本共用，解析requirements.txt得到依赖包列表。
+"""
+
+import os
+import re
+from urllib.parse import urlparse
+
+# 行内注释：#前面需要有空白字符（URL中的#不是注释）
+_INLINE_COMMENT = re.compile(r"(^|\s+)#.*$")
+
+
+def load_requirements(requirements_file, _seen=None):
+    """
+    解析requirements.txt文件
+
+    去除注释和空行，合并续行，递归展开-r/--requirement引用的文件，
+    跳过其他pip选项行（如-c、-i、--extra-index-url），保留环境标记由pip处理。
+
+    参数:
+        requirements_file: requirements.txt文件路径
+
+    返回:
+        list: 依赖包说明列表（如"fastapi==0.104.1"）
+    """
+    seen = set() if _seen is None else _seen
+    path = os.path.abspath(requirements_file)
+    if path in seen:
+        return []
+    seen.add(path)
+
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    packages = []
+    for line in content.replace("\\\n", "").splitlines():
+        line = _INLINE_COMMENT.sub("", line).strip()
+        if not line:
+            continue
+
+        if line.startswith("-"):
+            # 引用其他依赖文件，路径相对于当前文件
+            option, _, value = line.partition(" ")
+            if option.startswith("--requirement="):
+                option, value = "--requirement", option.split("=", 1)[1]
+            if option in ("-r", "--requirement") and value.strip():
+                included = os.path.join(os.path.dirname(path), value.strip())
+                packages.extend(load_requirements(included, seen))
+            continue
+
+        packages.append(line)
+
+    return packages
+
+
+def is_requirement_satisfied(spec):
+    """
+    检查依赖包说明是否已被当前环境满足
+
+    环境标记不适用于当前平台的依赖视为已满足；无法判断时（如未安装packaging、
+    URL依赖）视为未满足。
+
+    参数:
+        spec: 依赖包说明（如"fastapi==0.104.1"）
+
+    返回:
+        bool: 是否已满足
+    """
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        return False
+
+    try:
+        requirement = Requirement(spec)
+    except InvalidRequirement:
+        return False
+
+    if requirement.marker is not None and not requirement.marker.evaluate():
+        return True
+    if requirement.url:
+        return False
+
+    try:
+        installed = version(requirement.name)
+    except PackageNotFoundError:
+        return False
+    return requirement.specifier.contains(installed, prereleases=True)
+
+
+def trusted_host_for(index_url):
+    """
+    获取镜像源URL对应的受信任主机名（用于pip --trusted-host）
+
+    参数:
+        index_url: 镜像源URL，为None时表示默认PyPI
+
+    返回:
+        str: 主机名，URL为空或无法解析时返回None
+    """
+    if not index_url:
+        return None
+    return urlparse(index_url).hostname
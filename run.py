@@ -11,6 +11,7 @@
 import os
 import sys
 import multiprocessing
+import psutil
 import uvicorn
 from app.core.config import settings
 
@@ -19,15 +20,21 @@ def get_optimal_workers():
     """
     计算最优的工作进程数量
     
-    基于CPU核心数计算最优的工作进程数量，一般为(2 * CPU核心数 + 1)。
-    但会限制在最小2个，最大16个的范围内，以避免资源过度占用。
+    配置了UVICORN_WORKERS时直接使用该值。否则以物理核心数为基准：
+    每个工作进程受GIL限制只能使用一个核心，超线程共享执行单元，
+    按逻辑核心数启动更多进程只会增加上下文切换。结果限制在最小2个、最大16个。
+    在关闭GIL的自由线程Python上，单个进程已能利用多个核心，进程数减半。
     
     返回:
         int: 最优的工作进程数量
     """
-    cores = multiprocessing.cpu_count()
-    workers = min(max(int(cores * 2 + 1), 2), 16)
-    return workers
+    if settings.UVICORN_WORKERS:
+        return settings.UVICORN_WORKERS
+    
+    cores = psutil.cpu_count(logical=False) or multiprocessing.cpu_count()
+    if getattr(sys, "_is_gil_enabled", lambda: True)() is False:
+        cores = cores // 2
+    return min(max(cores, 2), 16)
 
 
 def run_multi_process_server():
@@ -47,6 +54,16 @@ def run_multi_process_server():
         workers = 1
         reload = settings.APP_DEBUG
     
+    # 使用libuv事件循环和C实现的HTTP解析器（Windows不支持uvloop）
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    http = "httptools"
+    
+    print(f"服务启动中: http://{settings.APP_HOST}:{settings.APP_PORT}")
+    print(f"环境: {settings.APP_ENV}")
+    print(f"工作进程数: {workers}")
+    print(f"事件循环: {loop}, HTTP实现: {http}")
+    print(f"日志级别: {settings.LOG_LEVEL}")
+    
     # 启动服务器
     uvicorn.run(
         "app.main:app",
@@ -57,12 +74,9 @@ def run_multi_process_server():
         log_level=settings.LOG_LEVEL.lower(),
         proxy_headers=True,
         forwarded_allow_ips="*",
+        loop=loop,
+        http=http,
     )
-    
-    print(f"服务已启动: http://{settings.APP_HOST}:{settings.APP_PORT}")
-    print(f"环境: {settings.APP_ENV}")
-    print(f"工作进程数: {workers}")
-    print(f"日志级别: {settings.LOG_LEVEL}")
 
 
 if __name__ == "__main__":
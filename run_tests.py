@@ -10,21 +10,102 @@
 import os
 import sys
 import time
+import importlib
+import importlib.util
+import contextlib
 import subprocess
+import threading
+import traceback
 import datetime
 import argparse
+import hashlib
 import json
 import platform
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# 测试脚本路径
-PERFORMANCE_TEST = "performance_test.py"
-SECURITY_TEST = "security_test.py"
+# 测试模块名
+PERFORMANCE_TEST = "performance_test"
+SECURITY_TEST = "security_test"
 
 # 报告路径
 REPORTS_DIR = "test_reports"
 COMBINED_REPORT = os.path.join(REPORTS_DIR, "combined_report.md")
 
+# 综合报告中的详细测试报告链接
+DETAILED_REPORT_LINKS = """\
+
+## 详细测试报告
+
+- [性能测试报告](performance_report.md)
+- [性能测试结果图表](performance_results.png)
+- [安全测试报告](security_test_report.txt)
+
+"""
+
+# 综合报告结论，按总体评分分别为良好、一般、较差时使用
+CONCLUSION_INTRO = "## 结论\n\n本次测试对API系统进行了全面的性能和安全性评估。"
+CONCLUSION_GOOD = (
+    "总体来看，系统表现良好，可以满足生产环境的需求。"
+    "建议定期进行类似的测试，以确保系统性能和安全性持续保持在高水平。\n\n"
+)
+CONCLUSION_FAIR = (
+    "系统存在一定的问题，需要根据上述建议进行改进。"
+    "建议在实施改进后再次进行测试，以验证改进效果。\n\n"
+)
+CONCLUSION_POOR = (
+    "系统存在严重问题，需要进行全面修复和优化。"
+    "建议暂缓系统上线，先解决测试中发现的关键问题。\n\n"
+)
+
+# 性能测试报告中需要提取的章节标题和性能得分
+SECTION_HEADER_RE = re.compile(r"^##\s*(性能瓶颈分析|优化建议)")
+SCORE_RE = re.compile(r"性能得分\**[:：]\s*([\d.]+)")
+
+# 依赖检查通过的标记文件，内容为依赖列表和解释器的哈希
+DEPS_STAMP_FILE = Path(".test_deps_ok")
+
+# 综合报告中的安全性改进建议
+SECURITY_SUGGESTIONS = """\
+### 安全性改进
+
+1. **实施更完善的认证机制**:
+   - 添加防暴力破解措施，如账户锁定和延迟认证
+   - 实施双因素认证
+   - 强化密码策略
+
+2. **加强HTTP安全头**:
+   - 添加Content-Security-Policy头
+   - 确保X-XSS-Protection设置为1; mode=block
+   - 添加X-Content-Type-Options: nosniff
+   - 配置Strict-Transport-Security头
+
+3. **输入验证与输出转义**:
+   - 对所有用户输入进行严格验证
+   - 使用参数化查询防止SQL注入
+   - 适当转义输出以防止XSS攻击
+
+"""
+
+# 性能测试报告中没有优化建议时使用的默认建议
+DEFAULT_PERFORMANCE_SUGGESTIONS = """\
+1. **优化数据库操作**:
+   - 添加适当的索引
+   - 优化查询语句
+   - 实施数据库连接池
+
+2. **添加缓存层**:
+   - 对频繁访问的数据实施缓存
+   - 使用Redis缓存会话和查询结果
+
+3. **代码优化**:
+   - 使用异步处理非阻塞操作
+   - 优化计算密集型代码
+
+"""
+
 # 确保所需的目录存在
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
@@ -32,17 +113,29 @@ def check_prerequisites():
     """检查运行测试所需的依赖"""
     print("📋 检查测试依赖...")
     
+    # asyncio、statistics等标准库模块总是存在，不做检查
     required_modules = [
         "requests", "aiohttp", "matplotlib", "numpy", "psutil", 
-        "statistics", "fastapi", "pytest", "asyncio"
+        "fastapi", "pytest"
     ]
     
+    # 依赖列表和解释器未变化时跳过导入检查
+    stamp_key = hashlib.sha256(
+        repr((sorted(required_modules), sys.version, sys.executable)).encode()
+    ).hexdigest()
+    try:
+        if DEPS_STAMP_FILE.read_text(encoding="utf-8").strip() == stamp_key:
+            print("✅ 依赖已检查过，跳过")
+            return True
+    except OSError:
+        pass
+    
     missing_modules = []
     for module in required_modules:
-        try:
-            __import__(module)
+        # 只查找模块规格而不执行模块代码，避免导入matplotlib、numpy等重型模块
+        if importlib.util.find_spec(module) is not None:
             print(f"✅ 已安装 {module}")
-        except ImportError:
+        else:
             missing_modules.append(module)
             print(f"❌ 未安装 {module}")
     
@@ -59,47 +152,139 @@ def check_prerequisites():
             print("⚠️ 请先安装缺失的依赖再运行测试")
             return False
     
+    DEPS_STAMP_FILE.write_text(stamp_key, encoding="utf-8")
     return True
 
+# 各线程登记的输出缓冲区
+_CAPTURE = threading.local()
+
+# 测试输出只保留最后若干行，用于失败时的错误诊断
+OUTPUT_TAIL_LINES = 2000
+
+class TailBuffer:
+    """
+    只保留最后若干行的输出缓冲区
+
+    内存占用不随测试输出量增长；设置echo时同时实时写入echo流（用于--verbose）。
+    """
+    
+    def __init__(self, maxlen=OUTPUT_TAIL_LINES, echo=None):
+        self.lines = deque(maxlen=maxlen)
+        self.partial = ""
+        self.echo = echo
+    
+    def write(self, text):
+        if self.echo is not None:
+            self.echo.write(text)
+        lines = (self.partial + text).split("\n")
+        self.partial = lines.pop()
+        self.lines.extend(lines)
+        return len(text)
+    
+    def flush(self):
+        if self.echo is not None:
+            self.echo.flush()
+    
+    def getvalue(self):
+        return "\n".join([*self.lines, self.partial])
+
+class ThreadLocalStream:
+    """
+    按线程分发输出的流
+
+    当前线程登记了缓冲区时写入该缓冲区，否则写入原始流。
+    contextlib.redirect_stdout会替换全局的sys.stdout，多个测试并行运行时输出会混在一起，
+    因此以此代替，使每个测试线程的输出分别捕获。
+    """
+    
+    def __init__(self, name, original):
+        self.name = name
+        self.original = original
+    
+    def write(self, text):
+        return (getattr(_CAPTURE, self.name, None) or self.original).write(text)
+    
+    def flush(self):
+        (getattr(_CAPTURE, self.name, None) or self.original).flush()
+    
+    def __getattr__(self, attr):
+        return getattr(self.original, attr)
+
+@contextlib.contextmanager
+def capture_output(stdout, stderr):
+    """将当前线程的标准输出和标准错误写入指定缓冲区"""
+    if not isinstance(sys.stdout, ThreadLocalStream):
+        sys.stdout = ThreadLocalStream("stdout", sys.stdout)
+    if not isinstance(sys.stderr, ThreadLocalStream):
+        sys.stderr = ThreadLocalStream("stderr", sys.stderr)
+    
+    _CAPTURE.stdout, _CAPTURE.stderr = stdout, stderr
+    try:
+        yield
+    finally:
+        _CAPTURE.stdout = _CAPTURE.stderr = None
+
+def run_test_module(module_name, args):
+    """
+    在当前解释器中运行测试脚本
+
+    导入测试模块并调用其run()入口（没有时调用main()），复用已导入的依赖，
+    不再为每个测试启动新的Python进程。测试输出只保留最后若干行用于失败时报告，
+    --verbose时实时打印。
+    
+    参数:
+        module_name: 测试模块名（如"performance_test"）
+        args: 命令行参数
+        
+    返回:
+        bool: 测试是否成功
+    """
+    stdout = TailBuffer(echo=sys.__stdout__ if args.verbose else None)
+    stderr = TailBuffer()
+    success = True
+    
+    with capture_output(stdout, stderr):
+        try:
+            module = importlib.import_module(module_name)
+            entry = getattr(module, "run", None) or module.main
+            entry()
+        except SystemExit as e:
+            success = e.code in (None, 0)
+        except Exception:
+            traceback.print_exc()
+            success = False
+    
+    if not success:
+        print(stderr.getvalue())
+    return success
+
 def run_performance_test(args):
     """运行性能测试"""
     print("\n🚀 开始运行性能测试...")
     
     start_time = time.time()
-    result = subprocess.run([sys.executable, PERFORMANCE_TEST], 
-                          capture_output=True, text=True)
+    success = run_test_module(PERFORMANCE_TEST, args)
     elapsed_time = time.time() - start_time
     
     print(f"⏱️ 性能测试完成，耗时 {elapsed_time:.2f} 秒")
     
-    if result.returncode != 0:
-        print("❌ 性能测试失败:")
-        print(result.stderr)
-        return False
-    else:
-        if args.verbose:
-            print(result.stdout)
-        return True
+    if not success:
+        print("❌ 性能测试失败")
+    return success
 
 def run_security_test(args):
     """运行安全测试"""
     print("\n🔒 开始运行安全测试...")
     
     start_time = time.time()
-    result = subprocess.run([sys.executable, SECURITY_TEST], 
-                          capture_output=True, text=True)
+    success = run_test_module(SECURITY_TEST, args)
     elapsed_time = time.time() - start_time
     
     print(f"⏱️ 安全测试完成，耗时 {elapsed_time:.2f} 秒")
     
-    if result.returncode != 0:
-        print("❌ 安全测试失败:")
-        print(result.stderr)
-        return False
-    else:
-        if args.verbose:
-            print(result.stdout)
-        return True
+    if not success:
+        print("❌ 安全测试失败")
+    return success
 
 def gather_test_results():
     """收集所有测试结果"""
@@ -128,271 +313,235 @@ def gather_test_results():
     
     return results
 
-def generate_combined_report(results):
-    """生成综合测试报告"""
-    print("\n📊 生成综合测试报告...")
+def parse_performance_report(perf_report):
+    """
+    单次遍历性能测试报告，提取性能得分、瓶颈分析和优化建议
     
-    report_path = Path(COMBINED_REPORT)
-    
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write("# API测试综合报告\n\n")
-        
-        # 写入测试信息
-        f.write("## 测试信息\n\n")
-        f.write(f"- **测试时间**: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"- **测试环境**: {platform.system()} {platform.release()}\n")
-        f.write(f"- **处理器**: {platform.processor()}\n")
-        f.write(f"- **Python版本**: {platform.python_version()}\n\n")
-        
-        # 提取和计算总体评分
-        overall_score = 0
-        score_count = 0
+    参数:
+        perf_report: 性能测试报告（Markdown文本）
         
-        security_score = 0
-        performance_score = 0
-        
-        # 1. 提取安全测试评分
-        if "security_results" in results:
-            security_data = results["security_results"]
-            security_total = 0
-            security_passed = 0
-            security_skipped = 0
-            
-            for category, tests in security_data.items():
-                for test in tests:
-                    security_total += 1
-                    if test["status"] == "通过":
-                        security_passed += 1
-                    elif test["status"] == "跳过":
-                        security_skipped += 1
-            
-            if security_total > security_skipped:
-                security_score = (security_passed * 100) / (security_total - security_skipped)
-                overall_score += security_score
-                score_count += 1
+    返回:
+        (float, list, list): 性能得分（未找到时为None）、瓶颈分析条目、优化建议各行
+    """
+    score = None
+    bottlenecks = []
+    optimization_content = []
+    section = None
+    
+    for line in perf_report.splitlines():
+        # 标题行结束当前章节，遇到目标章节标题时开始记录
+        if line.startswith("##"):
+            match = SECTION_HEADER_RE.match(line)
+            section = match.group(1) if match else None
+            continue
         
-        # 2. 从性能测试报告中提取性能评分
-        if "performance_report" in results:
-            perf_report = results["performance_report"]
-            
-            # 寻找性能得分
-            score_line = None
-            for line in perf_report.split("\n"):
-                if "性能得分" in line:
-                    score_line = line
-                    break
-            
-            if score_line:
+        if score is None:
+            match = SCORE_RE.search(line)
+            if match:
                 try:
-                    score_str = score_line.split(":")[1].strip().split("/")[0]
-                    performance_score = float(score_str)
-                    overall_score += performance_score
-                    score_count += 1
-                except:
+                    score = float(match.group(1))
+                except ValueError:
                     pass
         
-        # 计算总体评分
-        if score_count > 0:
-            overall_score = overall_score / score_count
-        
-        # 确定总体评级
-        if overall_score >= 90:
-            overall_rating = "A (优秀)"
-            overall_summary = "系统整体表现优秀，性能和安全性处于较高水平。"
-        elif overall_score >= 80:
-            overall_rating = "B (良好)"
-            overall_summary = "系统整体表现良好，但在某些方面仍有优化空间。"
-        elif overall_score >= 70:
-            overall_rating = "C (一般)"
-            overall_summary = "系统表现一般，需要在多个方面进行改进。"
-        elif overall_score >= 60:
-            overall_rating = "D (较差)"
-            overall_summary = "系统表现较差，存在明显问题，需要全面优化。"
-        else:
-            overall_rating = "F (不及格)"
-            overall_summary = "系统存在严重问题，需要重构或全面修复。"
-        
-        # 写入总体评估
-        f.write("## 总体评估\n\n")
-        f.write(f"- **总体评分**: {overall_score:.2f}/100\n")
-        f.write(f"- **总体评级**: {overall_rating}\n")
-        f.write(f"- **安全评分**: {security_score:.2f}/100\n")
-        f.write(f"- **性能评分**: {performance_score:.2f}/100\n")
-        f.write(f"- **总体评估**: {overall_summary}\n\n")
-        
-        # 添加主要发现和建议
-        f.write("## 主要发现与建议\n\n")
-        
-        # 安全方面的主要发现
-        f.write("### 安全性问题\n\n")
-        if "security_results" in results:
-            security_data = results["security_results"]
-            warnings = []
-            
-            for category, tests in security_data.items():
-                for test in tests:
-                    if test["status"] == "警告" or test["status"] == "失败":
-                        warnings.append({
-                            "name": test["name"], 
-                            "status": test["status"], 
-                            "details": test["details"],
-                            "category": category
-                        })
-            
-            if warnings:
-                for warning in warnings[:5]:  # 只显示前5个警告
-                    f.write(f"- **{warning['name']}**: {warning['status']} - {warning['details']}\n")
-            else:
-                f.write("- 未发现显著的安全性问题\n")
-        else:
-            f.write("- 安全测试结果不可用\n")
-        
-        f.write("\n### 性能问题\n\n")
-        # 从性能报告中提取关键信息
-        if "performance_report" in results:
-            perf_report = results["performance_report"]
-            bottlenecks = []
-            
-            # 寻找瓶颈分析部分
-            in_bottleneck_section = False
-            for line in perf_report.split("\n"):
-                if "## 性能瓶颈分析" in line:
-                    in_bottleneck_section = True
-                    continue
-                
-                if in_bottleneck_section and line.startswith("##"):
-                    break
-                
-                if in_bottleneck_section and line.startswith("-"):
-                    bottlenecks.append(line)
-            
-            if bottlenecks:
-                for bottleneck in bottlenecks:
-                    f.write(f"{bottleneck}\n")
-            else:
-                f.write("- 未发现显著的性能瓶颈\n")
-        else:
-            f.write("- 性能测试结果不可用\n")
-        
-        # 添加改进建议
-        f.write("\n## 改进建议\n\n")
-        
-        # 安全性改进建议
-        f.write("### 安全性改进\n\n")
-        f.write("1. **实施更完善的认证机制**:\n")
-        f.write("   - 添加防暴力破解措施，如账户锁定和延迟认证\n")
-        f.write("   - 实施双因素认证\n")
-        f.write("   - 强化密码策略\n\n")
-        
-        f.write("2. **加强HTTP安全头**:\n")
-        f.write("   - 添加Content-Security-Policy头\n")
-        f.write("   - 确保X-XSS-Protection设置为1; mode=block\n")
-        f.write("   - 添加X-Content-Type-Options: nosniff\n")
-        f.write("   - 配置Strict-Transport-Security头\n\n")
-        
-        f.write("3. **输入验证与输出转义**:\n")
-        f.write("   - 对所有用户输入进行严格验证\n")
-        f.write("   - 使用参数化查询防止SQL注入\n")
-        f.write("   - 适当转义输出以防止XSS攻击\n\n")
+        if section == "性能瓶颈分析":
+            if line.startswith("-"):
+                bottlenecks.append(line)
+        elif section == "优化建议":
+            optimization_content.append(line)
+    
+    return score, bottlenecks, optimization_content
+
+def summarize_security_results(security_data):
+    """
+    单次遍历安全测试结果，统计各状态数量并收集警告和失败项
+    
+    参数:
+        security_data: 安全测试结果（类别 -> 测试结果列表）
         
-        # 性能改进建议
-        f.write("### 性能改进\n\n")
-        if "performance_report" in results:
-            perf_report = results["performance_report"]
-            
-            # 寻找优化建议部分
-            in_optimization_section = False
-            optimization_content = []
-            
-            for line in perf_report.split("\n"):
-                if "## 优化建议" in line:
-                    in_optimization_section = True
-                    continue
-                
-                if in_optimization_section and line.startswith("##"):
-                    break
-                
-                if in_optimization_section:
-                    optimization_content.append(line)
-            
-            if optimization_content:
-                f.write("".join(optimization_content))
-            else:
-                # 默认性能优化建议
-                f.write("1. **优化数据库操作**:\n")
-                f.write("   - 添加适当的索引\n")
-                f.write("   - 优化查询语句\n")
-                f.write("   - 实施数据库连接池\n\n")
-                
-                f.write("2. **添加缓存层**:\n")
-                f.write("   - 对频繁访问的数据实施缓存\n")
-                f.write("   - 使用Redis缓存会话和查询结果\n\n")
-                
-                f.write("3. **代码优化**:\n")
-                f.write("   - 使用异步处理非阻塞操作\n")
-                f.write("   - 优化计算密集型代码\n\n")
+    返回:
+        (int, int, int, list): 测试总数、通过数、跳过数、警告和失败项
+    """
+    total = passed = skipped = 0
+    warnings = []
+    
+    for category, tests in security_data.items():
+        for test in tests:
+            total += 1
+            status = test["status"]
+            if status == "通过":
+                passed += 1
+            elif status == "跳过":
+                skipped += 1
+            elif status == "警告" or status == "失败":
+                warnings.append({
+                    "name": test["name"], 
+                    "status": status, 
+                    "details": test["details"],
+                    "category": category
+                })
+    
+    return total, passed, skipped, warnings
+
+def generate_combined_report(results):
+    """生成综合测试报告"""
+    print("\n📊 生成综合测试报告...")
+    
+    report_path = Path(COMBINED_REPORT)
+    
+    # 报告时间和系统信息只获取一次，页眉、页脚和归档文件名使用同一时间
+    now = datetime.datetime.now()
+    now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+    report_time = now.strftime('%Y%m%d_%H%M%S')
+    sysname, release, proc, pyver = (
+        platform.system(), platform.release(), platform.processor(), platform.python_version()
+    )
+    
+    # 报告内容先收集到列表中，最后一次性写入文件
+    parts = []
+    p = parts.append
+    
+    p("# API测试综合报告\n\n")
+    
+    # 写入测试信息
+    p("## 测试信息\n\n")
+    p(f"- **测试时间**: {now_str}\n")
+    p(f"- **测试环境**: {sysname} {release}\n")
+    p(f"- **处理器**: {proc}\n")
+    p(f"- **Python版本**: {pyver}\n\n")
+    
+    # 提取和计算总体评分
+    overall_score = 0
+    score_count = 0
+    
+    security_score = 0
+    performance_score = 0
+    
+    # 单次遍历解析安全测试结果和性能测试报告
+    security_warnings = None
+    if "security_results" in results:
+        security_total, security_passed, security_skipped, security_warnings = \
+            summarize_security_results(results["security_results"])
+    
+    bottlenecks = optimization_content = None
+    if "performance_report" in results:
+        parsed_score, bottlenecks, optimization_content = \
+            parse_performance_report(results["performance_report"])
+    
+    # 1. 安全测试评分
+    if security_warnings is not None and security_total > security_skipped:
+        security_score = (security_passed * 100) / (security_total - security_skipped)
+        overall_score += security_score
+        score_count += 1
+    
+    # 2. 性能测试报告中的性能评分
+    if bottlenecks is not None and parsed_score is not None:
+        performance_score = parsed_score
+        overall_score += performance_score
+        score_count += 1
+    
+    # 计算总体评分
+    if score_count > 0:
+        overall_score = overall_score / score_count
+    
+    # 确定总体评级
+    if overall_score >= 90:
+        overall_rating = "A (优秀)"
+        overall_summary = "系统整体表现优秀，性能和安全性处于较高水平。"
+    elif overall_score >= 80:
+        overall_rating = "B (良好)"
+        overall_summary = "系统整体表现良好，但在某些方面仍有优化空间。"
+    elif overall_score >= 70:
+        overall_rating = "C (一般)"
+        overall_summary = "系统表现一般，需要在多个方面进行改进。"
+    elif overall_score >= 60:
+        overall_rating = "D (较差)"
+        overall_summary = "系统表现较差，存在明显问题，需要全面优化。"
+    else:
+        overall_rating = "F (不及格)"
+        overall_summary = "系统存在严重问题，需要重构或全面修复。"
+    
+    # 写入总体评估
+    p("## 总体评估\n\n")
+    p(f"- **总体评分**: {overall_score:.2f}/100\n")
+    p(f"- **总体评级**: {overall_rating}\n")
+    p(f"- **安全评分**: {security_score:.2f}/100\n")
+    p(f"- **性能评分**: {performance_score:.2f}/100\n")
+    p(f"- **总体评估**: {overall_summary}\n\n")
+    
+    # 添加主要发现和建议
+    p("## 主要发现与建议\n\n")
+    
+    # 安全方面的主要发现
+    p("### 安全性问题\n\n")
+    if security_warnings is not None:
+        if security_warnings:
+            for warning in security_warnings[:5]:  # 只显示前5个警告
+                p(f"- **{warning['name']}**: {warning['status']} - {warning['details']}\n")
         else:
-            # 默认性能优化建议
-            f.write("1. **优化数据库操作**:\n")
-            f.write("   - 添加适当的索引\n")
-            f.write("   - 优化查询语句\n")
-            f.write("   - 实施数据库连接池\n\n")
-            
-            f.write("2. **添加缓存层**:\n")
-            f.write("   - 对频繁访问的数据实施缓存\n")
-            f.write("   - 使用Redis缓存会话和查询结果\n\n")
-            
-            f.write("3. **代码优化**:\n")
-            f.write("   - 使用异步处理非阻塞操作\n")
-            f.write("   - 优化计算密集型代码\n\n")
-        
-        # 添加测试报告的链接
-        f.write("\n## 详细测试报告\n\n")
-        f.write("- [性能测试报告](performance_report.md)\n")
-        f.write("- [性能测试结果图表](performance_results.png)\n")
-        f.write("- [安全测试报告](security_test_report.txt)\n\n")
-        
-        # 添加结论
-        f.write("## 结论\n\n")
-        f.write("本次测试对API系统进行了全面的性能和安全性评估。")
-        
-        if overall_score >= 80:
-            f.write("总体来看，系统表现良好，可以满足生产环境的需求。")
-            f.write("建议定期进行类似的测试，以确保系统性能和安全性持续保持在高水平。\n\n")
-        elif overall_score >= 60:
-            f.write("系统存在一定的问题，需要根据上述建议进行改进。")
-            f.write("建议在实施改进后再次进行测试，以验证改进效果。\n\n")
+            p("- 未发现显著的安全性问题\n")
+    else:
+        p("- 安全测试结果不可用\n")
+    
+    p("\n### 性能问题\n\n")
+    # 从性能报告中提取关键信息
+    if bottlenecks is not None:
+        if bottlenecks:
+            for bottleneck in bottlenecks:
+                p(f"{bottleneck}\n")
         else:
-            f.write("系统存在严重问题，需要进行全面修复和优化。")
-            f.write("建议暂缓系统上线，先解决测试中发现的关键问题。\n\n")
-        
-        f.write("\n\n---\n")
-        f.write(f"*报告生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
+            p("- 未发现显著的性能瓶颈\n")
+    else:
+        p("- 性能测试结果不可用\n")
     
-    print(f"✅ 综合报告已生成: {report_path}")
+    # 添加改进建议
+    p("\n## 改进建议\n\n")
+    
+    # 安全性改进建议
+    p(SECURITY_SUGGESTIONS)
+    
+    # 性能改进建议：优先使用性能测试报告中的优化建议
+    p("### 性能改进\n\n")
+    if optimization_content:
+        p("\n".join(optimization_content).strip() + "\n\n")
+    else:
+        p(DEFAULT_PERFORMANCE_SUGGESTIONS)
+    
+    # 添加测试报告的链接
+    p(DETAILED_REPORT_LINKS)
     
-    # 复制报告和图表到报告目录
-    report_time = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    # 添加结论
+    p(CONCLUSION_INTRO)
+    if overall_score >= 80:
+        p(CONCLUSION_GOOD)
+    elif overall_score >= 60:
+        p(CONCLUSION_FAIR)
+    else:
+        p(CONCLUSION_POOR)
+    
+    p("\n\n---\n")
+    p(f"*报告生成时间: {now_str}*")
     
-    if Path("performance_report.md").exists():
-        os.makedirs(os.path.join(REPORTS_DIR, "performance"), exist_ok=True)
-        dst_path = os.path.join(REPORTS_DIR, "performance", f"performance_report_{report_time}.md")
-        Path("performance_report.md").rename(dst_path)
+    report_path.write_text("".join(parts), encoding="utf-8")
     
-    if Path("performance_results.png").exists():
-        os.makedirs(os.path.join(REPORTS_DIR, "performance"), exist_ok=True)
-        dst_path = os.path.join(REPORTS_DIR, "performance", f"performance_chart_{report_time}.png")
-        Path("performance_results.png").rename(dst_path)
+    print(f"✅ 综合报告已生成: {report_path}")
     
-    if Path("security_test_report.txt").exists():
-        os.makedirs(os.path.join(REPORTS_DIR, "security"), exist_ok=True)
-        dst_path = os.path.join(REPORTS_DIR, "security", f"security_report_{report_time}.txt")
-        Path("security_test_report.txt").rename(dst_path)
+    # 移动报告和图表到报告目录
+    perf_dir = Path(REPORTS_DIR) / "performance"
+    sec_dir = Path(REPORTS_DIR) / "security"
+    perf_dir.mkdir(parents=True, exist_ok=True)
+    sec_dir.mkdir(parents=True, exist_ok=True)
     
-    if Path("security_test_results.json").exists():
-        os.makedirs(os.path.join(REPORTS_DIR, "security"), exist_ok=True)
-        dst_path = os.path.join(REPORTS_DIR, "security", f"security_results_{report_time}.json")
-        Path("security_test_results.json").rename(dst_path)
+    moves = [
+        ("performance_report.md", perf_dir / f"performance_report_{report_time}.md"),
+        ("performance_results.png", perf_dir / f"performance_chart_{report_time}.png"),
+        ("security_test_report.txt", sec_dir / f"security_report_{report_time}.txt"),
+        ("security_test_results.json", sec_dir / f"security_results_{report_time}.json"),
+    ]
+    for src, dst in moves:
+        try:
+            os.replace(src, dst)
+        except FileNotFoundError:
+            pass
 
 def main():
     """主函数"""
@@ -401,6 +550,9 @@ def main():
     parser.add_argument("--security", action="store_true", help="只运行安全测试")
     parser.add_argument("--all", action="store_true", help="运行所有测试")
     parser.add_argument("--verbose", action="store_true", help="显示详细输出")
+    parser.add_argument("--parallel", action=argparse.BooleanOptionalAction, default=False,
+                        help="同时运行性能测试和安全测试（默认依次运行）。两者相互施加负载，"
+                             "延迟、吞吐量和暴力破解防护等基于时间的结果会失真")
     args = parser.parse_args()
     
     # 默认运行所有测试
@@ -413,12 +565,20 @@ def main():
     if not check_prerequisites():
         return
     
-    # 运行测试
+    # 运行测试：两类测试相互独立，默认在两个线程中同时运行
+    runners = []
     if args.all or args.performance:
-        run_performance_test(args)
+        runners.append(run_performance_test)
     
     if args.all or args.security:
-        run_security_test(args)
+        runners.append(run_security_test)
+    
+    if args.parallel and len(runners) > 1:
+        with ThreadPoolExecutor(max_workers=len(runners)) as executor:
+            list(executor.map(lambda runner: runner(args), runners))
+    else:
+        for runner in runners:
+            runner(args)
     
     # 生成报告
     results = gather_test_results()
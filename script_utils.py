@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+脚本公共工具模块
+
+供依赖安装脚本和依赖包下载脚本共用，提供日志输出、命令执行和环境检查功能。
+"""
+
+import functools
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+# 可重试的网络错误：限流（HTTP 429）和连接失败/超时
+_RETRYABLE_ERROR = re.compile(
+    r"\b429\b|Too Many Requests|ConnectionError|Connection (?:reset|refused|aborted)|"
+    r"Read ?timed ?out|ReadTimeoutError|Temporary failure in name resolution",
+    re.IGNORECASE,
+)
+
+# 重试之间的最长等待时间（秒）
+MAX_BACKOFF = 30
+
+
+def log_message(message, level="INFO"):
+    """打印带有时间戳和日志级别的消息（整行一次写出，多线程输出不会交错）"""
+    sys.stdout.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [{level}] {message}\n")
+    if level != "INFO":
+        sys.stdout.flush()
+
+
+def run_command(command, timeout=None):
+    """
+    运行命令并返回结果
+
+    参数:
+        command: 要执行的命令（字符串或列表）
+        timeout: 超时时间（秒）
+
+    返回:
+        (returncode, stdout, stderr): 命令执行的返回代码、标准输出和标准错误
+    """
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=isinstance(command, str),
+            text=True,
+        )
+
+        stdout, stderr = process.communicate(timeout=timeout)
+        return process.returncode, stdout, stderr
+    except subprocess.TimeoutExpired:
+        process.kill()
+        return 1, "", "命令执行超时"
+    except Exception as e:
+        return 1, "", f"命令执行出错: {str(e)}"
+
+
+def run_command_streaming(command, timeout=None, tail_lines=20):
+    """
+    运行耗时较长的命令，实时输出命令的输出内容
+
+    标准错误合并到标准输出，逐行打印，只保留最后若干行用于报告错误，
+    内存占用不随输出量增长。超时由定时器终止进程。
+
+    参数:
+        command: 要执行的命令（字符串或列表）
+        timeout: 超时时间（秒）
+        tail_lines: 保留的最后输出行数
+
+    返回:
+        (returncode, output): 命令执行的返回代码和最后若干行输出
+    """
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=isinstance(command, str),
+            text=True,
+            bufsize=1,
+        )
+    except Exception as e:
+        return 1, f"命令执行出错: {str(e)}"
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+
+    tail = deque(maxlen=tail_lines)
+    try:
+        for line in process.stdout:
+            print(line, end="", flush=True)
+            tail.append(line)
+        process.wait()
+    finally:
+        if timer:
+            timer.cancel()
+        process.stdout.close()
+
+    output = "".join(tail)
+    if timed_out.is_set():
+        return 1, output + "命令执行超时"
+    return process.returncode, output
+
+
+@functools.lru_cache(maxsize=None)
+def check_pip():
+    """检查pip是否可用，返回可用的pip命令（pip或pip3），结果在进程内缓存"""
+    commands = ["pip", "pip3"]
+
+    for cmd in commands:
+        returncode, stdout, _ = run_command([cmd, "--version"])
+        if returncode == 0:
+            log_message(f"找到可用的pip: {stdout.strip()}")
+            return cmd
+
+    log_message("未找到可用的pip，请先安装pip", "ERROR")
+    return None
+
+
+def check_python_version():
+    """检查Python版本是否满足要求"""
+    version_info = sys.version_info
+    if version_info.major < 3 or (version_info.major == 3 and version_info.minor < 8):
+        log_message(
+            f"Python版本 {sys.version} 过低，需要 Python 3.8 或更高版本", "ERROR"
+        )
+        return False
+
+    log_message(f"Python版本检查通过: {sys.version}")
+    return True
+
+
+def run_command_with_backoff(command, timeout=None, max_attempts=4):
+    """
+    运行命令，遇到限流或网络错误时指数退避后重试
+
+    只有标准错误中出现429/连接错误时才等待并重试，其他失败立即返回，
+    正常的命令不会产生任何等待。
+
+    参数:
+        command: 要执行的命令（字符串或列表）
+        timeout: 每次执行的超时时间（秒）
+        max_attempts: 最多执行次数
+
+    返回:
+        (returncode, stdout, stderr): 最后一次执行的返回代码、标准输出和标准错误
+    """
+    for attempt in range(1, max_attempts + 1):
+        returncode, stdout, stderr = run_command(command, timeout=timeout)
+        if (
+            returncode == 0
+            or attempt == max_attempts
+            or not _RETRYABLE_ERROR.search(stderr)
+        ):
+            return returncode, stdout, stderr
+
+        delay = min(MAX_BACKOFF, 2**attempt)
+        log_message(
+            f"网络错误或请求受限，{delay} 秒后重试（第 {attempt} 次）", "WARNING"
+        )
+        time.sleep(delay)
@@ -39,7 +39,7 @@ def parse_arguments():
         '--queues',
         '-Q',
         default='default',
-        help='要监听的队列，逗号分隔的列表，例如: high_priority,default,low_priority'
+        help='要监听的队列，逗号分隔的列表，例如: high_priority,default,low_priority,status'
     )
     
     parser.add_argument(
@@ -73,6 +73,14 @@ def parse_arguments():
         help='进程池实现'
     )
     
+    parser.add_argument(
+        '--optimization',
+        '-O',
+        default='fair',
+        choices=['default', 'fair'],
+        help='任务分发策略，fair表示只向空闲的子进程分发任务'
+    )
+    
     return parser.parse_args()
 
 
@@ -89,6 +97,7 @@ def start_worker(args):
     logger.info(f"并发数: {args.concurrency}")
     logger.info(f"日志级别: {args.loglevel}")
     logger.info(f"进程池: {args.pool}")
+    logger.info(f"分发策略: {args.optimization}")
     if args.beat:
         logger.info("同时启动Celery Beat")
     
@@ -99,6 +108,7 @@ def start_worker(args):
         '--concurrency', str(args.concurrency),
         '--loglevel', args.loglevel,
         '--pool', args.pool,
+        '-O', args.optimization,
     ]
     
     # 如果需要同时启动Beat，添加相应参数
@@ -9,10 +9,13 @@
 """
 
 import sys
+import errno
 import socket
+import selectors
 import json
 import time
 import os
+from collections import namedtuple
 from datetime import datetime
 from pathlib import Path
 
@@ -22,95 +25,184 @@ def log(message, level="INFO"):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {level}: {message}")
 
-def check_server(host="localhost", port=8000, timeout=5):
+# 健康检查端点路径
+HEALTH_PATH = "/api/v1/health"
+
+# 单次recv读取的字节数
+RECV_SIZE = 4096
+
+# 非阻塞connect返回的"连接进行中"错误码（Windows下为WSAEWOULDBLOCK）
+CONNECT_IN_PROGRESS = (
+    0,
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EALREADY,
+    getattr(errno, "WSAEWOULDBLOCK", None),
+)
+
+# 单个端点的探测结果：是否建立连接、HTTP状态行、错误信息
+ProbeResult = namedtuple("ProbeResult", ["connected", "status_line", "error"])
+
+
+def build_http_request(host, port, path):
+    """构造探测使用的HTTP GET请求"""
+    return (
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        f"User-Agent: check_server.py\r\n"
+        f"Accept: application/json\r\n"
+        f"Connection: close\r\n\r\n"
+    ).encode()
+
+
+def probe_http_endpoints(targets, timeout=5):
     """
-    检查服务器是否可访问
-    
+    并发探测多个HTTP端点
+
+    所有连接使用非阻塞套接字一次性发起，并注册到selectors
+    （Linux下为epoll）：连接可写后发送GET请求，随后等待可读并接收响应。
+    多个端点的TCP握手和HTTP往返相互重叠，不再逐个串行阻塞等待。
+
     参数:
-        host: 服务器主机名
-        port: 服务器端口
-        timeout: 连接超时时间(秒)
-        
+        targets: (host, port, path) 元组列表
+        timeout: 整体超时时间(秒)
+
     返回:
-        bool: 服务器是否可访问
+        dict: 以 (host, port, path) 为键、ProbeResult 为值的探测结果
     """
-    log(f"检查服务器 {host}:{port} 是否可访问...")
-    
+    results = {}
+    selector = selectors.DefaultSelector()
+    deadline = time.monotonic() + timeout
+
+    def finish(state, connected, error=None):
+        selector.unregister(state["sock"])
+        state["sock"].close()
+        response = bytes(state["response"]).decode("utf-8", errors="ignore")
+        status_line = response.split("\r\n", 1)[0] if response else None
+        results[state["target"]] = ProbeResult(connected, status_line, error)
+
     try:
-        # 创建TCP套接字
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        
-        # 尝试连接
-        result = sock.connect_ex((host, port))
-        sock.close()
-        
-        if result == 0:
-            log(f"服务器 {host}:{port} 可访问")
-            return True
-        else:
-            log(f"服务器 {host}:{port} 不可访问 (错误码: {result})", "ERROR")
-            return False
-    except socket.error as e:
-        log(f"连接服务器时出错: {str(e)}", "ERROR")
-        return False
+        # 一次性发起所有连接
+        for target in targets:
+            host, port, path = target
+            try:
+                # 只解析IPv4地址：localhost可能先解析为::1，而服务默认绑定0.0.0.0
+                family, type_, proto, _, address = socket.getaddrinfo(
+                    host, port, family=socket.AF_INET, type=socket.SOCK_STREAM
+                )[0]
+                sock = socket.socket(family, type_, proto)
+            except OSError as e:
+                results[target] = ProbeResult(False, None, str(e))
+                continue
+
+            sock.setblocking(False)
+            result = sock.connect_ex(address)
+            if result not in CONNECT_IN_PROGRESS:
+                sock.close()
+                results[target] = ProbeResult(False, None, os.strerror(result))
+                continue
+
+            state = {
+                "target": target,
+                "sock": sock,
+                "request": memoryview(build_http_request(host, port, path)),
+                "response": bytearray(),
+            }
+            selector.register(sock, selectors.EVENT_WRITE, state)
+
+        # 统一等待各连接的事件
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            for key, events in selector.select(remaining):
+                state = key.data
+                sock = state["sock"]
+
+                if events & selectors.EVENT_WRITE:
+                    # 首次可写时检查连接结果
+                    if "connected" not in state:
+                        error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                        if error:
+                            finish(state, False, os.strerror(error))
+                            continue
+                        state["connected"] = True
+
+                    try:
+                        sent = sock.send(state["request"])
+                    except BlockingIOError:
+                        continue
+                    except OSError as e:
+                        finish(state, True, str(e))
+                        continue
+
+                    state["request"] = state["request"][sent:]
+                    if not state["request"]:
+                        selector.modify(sock, selectors.EVENT_READ, state)
+                    continue
+
+                try:
+                    data = sock.recv(RECV_SIZE)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    finish(state, True, str(e))
+                    continue
+
+                if data:
+                    state["response"] += data
+                else:
+                    finish(state, True)
+
+        # 超时仍未完成的连接
+        for key in list(selector.get_map().values()):
+            state = key.data
+            finish(state, "connected" in state, "timed out")
+    finally:
+        selector.close()
+
+    return results
+
 
 def check_health_endpoint(host="localhost", port=8000, timeout=5):
     """
-    检查健康检查端点是否正常
-    
+    检查服务器可用性和健康检查端点
+
+    只建立一次TCP连接：连接成功即视为服务器可访问，
+    随后在同一连接上请求健康检查端点。
+
     参数:
         host: 服务器主机名
         port: 服务器端口
         timeout: 连接超时时间(秒)
-        
+
     返回:
-        bool: 健康检查是否正常
+        (bool, bool): 服务器是否可访问、健康检查是否正常
     """
-    log(f"检查健康检查端点 http://{host}:{port}/api/v1/health...")
-    
-    try:
-        # 创建TCP套接字
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        
-        # 连接服务器
-        sock.connect((host, port))
-        
-        # 发送HTTP请求
-        request = (
-            f"GET /api/v1/health HTTP/1.1\r\n"
-            f"Host: {host}:{port}\r\n"
-            f"User-Agent: check_server.py\r\n"
-            f"Accept: application/json\r\n"
-            f"Connection: close\r\n\r\n"
-        )
-        
-        sock.sendall(request.encode())
-        
-        # 接收响应
-        response = b""
-        while True:
-            data = sock.recv(4096)
-            if not data:
-                break
-            response += data
-        
-        sock.close()
-        
-        # 解析响应
-        response_str = response.decode('utf-8', errors='ignore')
-        status_line = response_str.split('\r\n')[0]
-        
-        if "200 OK" in status_line:
-            log("健康检查端点正常")
-            return True
-        else:
-            log(f"健康检查端点返回非200状态: {status_line}", "ERROR")
-            return False
-    except Exception as e:
-        log(f"请求健康检查端点时出错: {str(e)}", "ERROR")
-        return False
+    log(f"检查服务器 {host}:{port} 及健康检查端点 http://{host}:{port}{HEALTH_PATH}...")
+
+    target = (host, port, HEALTH_PATH)
+    result = probe_http_endpoints([target], timeout)[target]
+
+    # 连接未建立：端口关闭或连接超时
+    if not result.connected:
+        log(f"服务器 {host}:{port} 不可访问 ({result.error})", "ERROR")
+        return False, False
+
+    log(f"服务器 {host}:{port} 可访问")
+
+    # 连接已建立但HTTP请求失败
+    if result.error is not None:
+        log(f"请求健康检查端点时出错: {result.error}", "ERROR")
+        return True, False
+
+    if result.status_line and "200 OK" in result.status_line:
+        log("健康检查端点正常")
+        return True, True
+
+    log(f"健康检查端点返回非200状态: {result.status_line}", "ERROR")
+    return True, False
 
 def check_environment():
     """
@@ -162,13 +254,8 @@ def main():
     # 检查环境
     env_info = check_environment()
     
-    # 检查服务器可用性
-    server_available = check_server()
-    
-    # 如果服务器可用，检查健康检查端点
-    health_ok = False
-    if server_available:
-        health_ok = check_health_endpoint()
+    # 检查服务器可用性和健康检查端点
+    server_available, health_ok = check_health_endpoint()
     
     # 总结结果
     log("\n检查结果:")
@@ -5,55 +5,76 @@
 新用户注册测试脚本
 
 用于测试用户注册功能的简单Python脚本。
+单次注册使用requests.Session，批量注册使用共享连接池的aiohttp会话，
+多次请求复用保持连接，不再为每个请求重新建立TCP连接。
+
+用法:
+    python register_test.py          # 注册一个随机用户
+    python register_test.py 100      # 并发批量注册100个随机用户
 """
 
 import json
-import requests
+import sys
 import uuid
 import time
+import asyncio
 
-# 生成随机用户名，避免冲突
-random_suffix = str(uuid.uuid4())[:8]
-timestamp = int(time.time())
-
-# 注册数据
-register_data = {
-    "username": f"testuser_{random_suffix}",
-    "email": f"testuser_{timestamp}@example.com",
-    "password": "Test123456",
-    "confirm_password": "Test123456"
-}
+import aiohttp
+import requests
 
 # API地址
 register_url = "http://localhost:8000/api/v1/auth/register"
 
-# 发送请求
-try:
+# 请求超时时间（秒）
+REQUEST_TIMEOUT = 5
+
+# 批量注册时的并发数
+BULK_CONCURRENCY = 10
+
+
+def make_register_data():
+    """生成随机用户的注册数据，避免用户名和邮箱冲突"""
+    random_suffix = uuid.uuid4().hex[:8]
+    return {
+        "username": f"testuser_{random_suffix}",
+        "email": f"testuser_{int(time.time())}_{random_suffix}@example.com",
+        "password": "Test123456",
+        "confirm_password": "Test123456"
+    }
+
+
+def register_user(session, register_data):
+    """
+    注册单个用户并打印结果
+
+    参数:
+        session: requests.Session会话
+        register_data: 注册数据
+
+    返回:
+        bool: 是否注册成功
+    """
     print(f"尝试注册用户: {register_data['username']}")
     print(f"用户数据: {json.dumps(register_data, ensure_ascii=False, indent=2)}")
-    
-    response = requests.post(
-        register_url,
-        json=register_data,
-        headers={"Content-Type": "application/json"}
-    )
-    
+
+    response = session.post(register_url, json=register_data, timeout=REQUEST_TIMEOUT)
+
     # 打印响应
     print(f"\n状态码: {response.status_code}")
-    
+
     try:
         response_json = response.json()
         print(f"响应内容: {json.dumps(response_json, ensure_ascii=False, indent=2)}")
-    except:
+    except ValueError:
         print(f"响应内容: {response.text}")
-    
+
     # 如果注册成功，显示账号信息
     if response.status_code == 200:
         print("\n✅ 注册成功! 账号信息:")
         print(f"用户名: {register_data['username']}")
         print(f"邮箱: {register_data['email']}")
         print(f"密码: {register_data['password']}")
-        
+
         # 保存用户信息到文件，方便后续测试
         with open("last_registered_user.json", "w", encoding="utf-8") as f:
             json.dump({
@@ -62,8 +83,60 @@ try:
                 "password": register_data['password']
             }, f, ensure_ascii=False, indent=2)
             print("\n用户信息已保存到 last_registered_user.json")
-    else:
-        print("\n❌ 注册失败。请检查错误信息。")
-        
-except Exception as e:
-    print(f"发生错误: {str(e)}") 
\ No newline at end of file
+        return True
+
+    print("\n❌ 注册失败。请检查错误信息。")
+    return False
+
+
+async def register_users_concurrently(count, concurrency=BULK_CONCURRENCY):
+    """
+    并发批量注册随机用户
+
+    参数:
+        count: 注册用户数量
+        concurrency: 并发数（同时也是连接池大小）
+
+    返回:
+        (int, int): 成功和失败的数量
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    succeeded = 0
+    remaining = iter(range(count))
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def worker():
+            nonlocal succeeded
+            for _ in remaining:
+                try:
+                    async with session.post(register_url, json=make_register_data()) as response:
+                        await response.read()
+                        if response.status == 200:
+                            succeeded += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"发生错误: {str(e)}")
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+
+    return succeeded, count - succeeded
+
+
+def main():
+    """主函数"""
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+        print(f"并发注册 {count} 个用户 (并发数: {BULK_CONCURRENCY})...")
+        succeeded, failed = asyncio.run(register_users_concurrently(count))
+        print(f"\n注册完成: {succeeded}成功, {failed}失败")
+        return
+
+    try:
+        with requests.Session() as session:
+            register_user(session, make_register_data())
+    except Exception as e:
+        print(f"发生错误: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
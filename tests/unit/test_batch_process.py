@@ -147,7 +147,7 @@ class TestBatchProcess:
         assert mock_logger.error.call_count == 2
         for i in [1, 3]:
             args, kwargs = mock_logger.error.call_args_list[i//2]
-            assert f"处理项目 {i} 失败" in args[0]
+            assert f"处理项目 {i} 失败" in args[0] % args[1:]
     
     def test_batch_process_performance(self, mock_logger):
         """测试批处理性能统计"""
@@ -193,4 +193,133 @@ class TestBatchProcess:
         # 验证批次大小为3会导致不同的批次数
         # 10个项目，批次大小为3，应该有4个批次（3+3+3+1）
         expected_batches = 4
-        assert (len(test_items) + 3 - 1) // 3 == expected_batches 
\ No newline at end of file
+        assert (len(test_items) + 3 - 1) // 3 == expected_batches 
+
+    def test_batch_process_parallel(self, mock_logger):
+        """测试并行批处理"""
+        task = SQLAlchemyTask()
+
+        def process_func(item, index):
+            time.sleep(0.05)  # 模拟I/O等待
+            if index == 3:
+                raise ValueError(f"处理 {item} 时出错")
+            return {"processed": True, "index": index}
+
+        test_items = [f"item{i}" for i in range(10)]
+
+        result = task.batch_process(test_items, process_func, batch_size=5, parallelism=5)
+
+        # 验证结果按数据项顺序收集
+        assert result["processed"] == 10
+        assert result["errors"] == 1
+        assert [r["index"] for r in result["results"]] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+        assert result["error_details"][0]["index"] == 3
+
+        # 两个批次各并行执行一次等待，而不是串行等待10次
+        assert result["time"] < 0.4
+
+    def test_batch_process_with_batch_func(self, mock_logger):
+        """测试整批处理函数每个批次只调用一次"""
+        task = SQLAlchemyTask()
+        process_func = MagicMock()
+        process_batch_func = MagicMock(
+            side_effect=lambda batch, start: [{"index": start + i} for i in range(len(batch))]
+        )
+        test_items = [f"item{i}" for i in range(10)]
+
+        result = task.batch_process(
+            test_items, process_func, batch_size=4, process_batch_func=process_batch_func
+        )
+
+        # 验证结果
+        assert result["success"] == True
+        assert [r["index"] for r in result["results"]] == list(range(10))
+
+        # 10个项目，批次大小为4，整批函数调用3次，不调用单项处理函数
+        assert process_batch_func.call_args_list == [
+            call(test_items[0:4], 0),
+            call(test_items[4:8], 4),
+            call(test_items[8:10], 8),
+        ]
+        process_func.assert_not_called()
+
+    def test_batch_process_batch_func_failure(self, mock_logger):
+        """测试整批处理失败时整批记为错误，不逐项重试"""
+        task = SQLAlchemyTask()
+        process_func = MagicMock()
+
+        def process_batch_func(batch, start):
+            if start == 0:
+                raise RuntimeError("批量写入失败")
+            if start == 3:
+                return [{"index": start}]
+            return [{"index": start + i} for i in range(len(batch))]
+
+        test_items = [f"item{i}" for i in range(9)]
+
+        with patch('app.tasks.common_tasks.concurrent.futures.ThreadPoolExecutor') as mock_pool:
+            result = task.batch_process(
+                test_items,
+                process_func,
+                batch_size=3,
+                parallelism=4,
+                process_batch_func=process_batch_func,
+            )
+
+        # 抛出异常和结果数量不符的两个批次全部记为错误
+        assert result["errors"] == 6
+        assert [e["index"] for e in result["error_details"]] == list(range(6))
+        assert result["error_details"][0]["exc_type"] == "RuntimeError"
+        assert result["error_details"][3]["exc_type"] == "ValueError"
+        assert [r["index"] for r in result["results"]] == [6, 7, 8]
+
+        # 不逐项重试，也不创建线程池
+        process_func.assert_not_called()
+        mock_pool.assert_not_called()
+
+    def test_batch_process_traceback_only_for_reported_errors(self, mock_logger):
+        """测试只为返回的前10个错误格式化堆栈"""
+        task = SQLAlchemyTask()
+
+        def process_func(item, index):
+            raise ValueError(f"处理 {item} 时出错")
+
+        result = task.batch_process(list(range(12)), process_func, batch_size=5)
+
+        assert result["errors"] == 12
+        assert len(result["error_details"]) == 10
+        assert all("traceback" in e for e in result["error_details"])
+        assert all(e["exc_type"] == "ValueError" for e in result["error_details"])
+
+    def test_batch_process_generator(self, mock_logger):
+        """测试批处理惰性读取生成器中的数据项"""
+        task = SQLAlchemyTask()
+        task.update_progress = MagicMock()
+        consumed = []
+
+        def generate_items():
+            for i in range(7):
+                consumed.append(i)
+                yield f"item{i}"
+
+        def process_batch_func(batch, start):
+            # 处理当前批次时，生成器最多只被多读取到当前批次末尾
+            assert len(consumed) == start + len(batch)
+            return [{"index": start + i} for i in range(len(batch))]
+
+        result = task.batch_process(
+            generate_items(),
+            MagicMock(),
+            batch_size=3,
+            task_id="test-task-id",
+            process_batch_func=process_batch_func,
+        )
+
+        assert result["processed"] == 7
+        assert [r["index"] for r in result["results"]] == list(range(7))
+
+        # 总数未知时只报告已处理数量
+        args, kwargs = task.update_progress.call_args_list[1]
+        assert args[1] == 0
+        assert args[2]["processed"] == 3
+        assert args[2]["total"] is None
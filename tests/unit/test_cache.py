@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+缓存工具测试模块
+
+测试CacheManager的序列化、Redis读写、内存LRU缓存和缓存装饰器。
+"""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import Request, Response
+
+from app.utils import cache as cache_module
+from app.utils.cache import CacheManager, _deserialize, _serialize, cache
+
+
+class TestCacheSerialization:
+    """缓存序列化测试类"""
+
+    def test_json_round_trip(self):
+        """测试JSON数据的序列化往返"""
+        value = {"items": [1, 2, 3], "name": "模型", "ok": True, "none": None}
+
+        data = _serialize(value)
+
+        assert data.startswith(b"j")
+        assert _deserialize(data) == value
+
+    def test_response_round_trip(self):
+        """测试Response对象保留状态码、响应头和响应体"""
+        response = Response(
+            content=b'{"a":1}', status_code=201, media_type="application/json"
+        )
+        response.headers["X-Test"] = "1"
+
+        restored = _deserialize(_serialize(response))
+
+        assert isinstance(restored, Response)
+        assert restored.status_code == 201
+        assert restored.body == b'{"a":1}'
+        assert restored.headers["x-test"] == "1"
+        assert restored.headers["content-type"] == "application/json"
+
+    def test_unknown_format(self):
+        """测试未知格式数据抛出异常"""
+        with pytest.raises(ValueError):
+            _deserialize(b"x123")
+
+    @pytest.mark.asyncio
+    async def test_set_unserializable_memory_only(self):
+        """测试无法序列化的值只保留在内存缓存中"""
+        manager = CacheManager()
+        manager._redis = MagicMock()
+        value = object()
+
+        result = await manager.set("key", value)
+
+        assert result is False
+        manager._redis.setex.assert_not_called()
+        assert manager._memory_cache["key"][0] is value
+
+    @pytest.mark.asyncio
+    async def test_redis_round_trip(self):
+        """测试通过异步Redis客户端读写缓存"""
+        store = {}
+
+        async def setex(key, expire, data):
+            store[key] = data
+            return True
+
+        async def get(key):
+            return store.get(key)
+
+        manager = CacheManager()
+        manager._redis = MagicMock()
+        manager._redis.setex = AsyncMock(side_effect=setex)
+        manager._redis.get = AsyncMock(side_effect=get)
+
+        assert await manager.set("key", {"a": 1}) is True
+        manager._memory_cache.clear()
+
+        assert await manager.get("key") == {"a": 1}
+        manager._redis.get.assert_awaited_once_with("key")
+
+    @pytest.mark.asyncio
+    async def test_clear_pattern_scan_unlink(self):
+        """测试按模式清除缓存使用SCAN遍历并分批UNLINK"""
+        keys = [f"api:{i}".encode() for i in range(1200)]
+
+        async def scan_iter(match, count):
+            for key in keys:
+                yield key
+
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(side_effect=lambda: [len(pipe.unlink.call_args.args)])
+
+        manager = CacheManager()
+        manager._redis = MagicMock()
+        manager._redis.scan_iter = scan_iter
+        manager._redis.pipeline.return_value = pipe
+        manager._memory_cache["api:mem"] = (1, time.monotonic() + 60)
+
+        cleared = await manager.clear_pattern("api:")
+
+        assert cleared == 1201
+        assert [len(c.args) for c in pipe.unlink.call_args_list] == [500, 500, 200]
+        manager._redis.pipeline.assert_called_once_with(transaction=False)
+        manager._redis.keys.assert_not_called()
+
+
+class TestMemoryCache:
+    """内存缓存测试类"""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        manager = CacheManager()
+
+        with patch("app.utils.cache._MEMORY_CACHE_MAXSIZE", 2):
+            await manager.set("a", 1)
+            await manager.set("b", 2)
+            assert await manager.get("a") == 1  # 访问a使b成为最久未使用
+            await manager.set("c", 3)
+
+        assert list(manager._memory_cache) == ["a", "c"]
+        assert await manager.get("b") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_removed(self):
+        """测试过期条目在读取时移除"""
+        manager = CacheManager()
+        manager._memory_cache["key"] = ("value", time.monotonic() - 1)
+
+        assert await manager.get("key", "default") == "default"
+        assert "key" not in manager._memory_cache
+
+
+def _make_request(path: str, query: str = "", headers=None) -> Request:
+    """构造测试用的GET请求"""
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [
+                (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+            ],
+        }
+    )
+
+
+class TestCacheDecorator:
+    """缓存装饰器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_cache_key(self):
+        """测试缓存键包含前缀，并随路径、查询参数和指定请求头变化"""
+        manager = MagicMock()
+        manager.get = AsyncMock(return_value=None)
+        manager.set = AsyncMock(return_value=True)
+
+        @cache(key_prefix="model:list:", vary_on_headers=["Authorization"])
+        async def endpoint(request: Request):
+            return {"ok": True}
+
+        with patch.object(cache_module, "cache_manager", manager):
+            await endpoint(_make_request("/models", "page=1", {"Authorization": "a"}))
+            await endpoint(_make_request("/models", "page=1", {"Authorization": "a"}))
+            await endpoint(_make_request("/models", "page=2", {"Authorization": "a"}))
+            await endpoint(_make_request("/models", "page=1", {"Authorization": "b"}))
+
+        keys = [c.args[0] for c in manager.get.await_args_list]
+        assert all(key.startswith("model:list:") for key in keys)
+        assert keys[0] == keys[1]
+        assert len(set(keys)) == 3
+
+    @pytest.mark.asyncio
+    async def test_request_keyword_and_missing(self):
+        """测试Request以关键字参数传入，以及没有Request参数时不包装函数"""
+        manager = MagicMock()
+        manager.get = AsyncMock(return_value={"cached": True})
+
+        @cache(key_prefix="model:")
+        async def endpoint(model_id: str, request: Request):
+            return {"ok": True}
+
+        async def plain(model_id: str):
+            return {"ok": True}
+
+        with patch.object(cache_module, "cache_manager", manager):
+            result = await endpoint("m1", request=_make_request("/models/m1"))
+
+        assert result == {"cached": True}
+        assert cache(key_prefix="model:")(plain) is plain
+
+    @pytest.mark.asyncio
+    async def test_etag_not_modified(self):
+        """测试响应带ETag和缓存头，客户端版本未变化时返回304"""
+        manager = CacheManager()
+        calls = []
+
+        @cache(expire=60, key_prefix="model:public:")
+        async def endpoint(request: Request):
+            calls.append(1)
+            return Response(content=b"data")
+
+        with patch.object(cache_module, "cache_manager", manager):
+            response = await endpoint(_make_request("/models/public"))
+            etag = response.headers["etag"]
+            assert response.headers["cache-control"] == "public, max-age=60"
+
+            not_modified = await endpoint(
+                _make_request("/models/public", headers={"If-None-Match": etag})
+            )
+            hit = await endpoint(_make_request("/models/public"))
+
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert hit.headers["x-cache"] == "HIT"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_private_cache_control_with_vary(self):
+        """测试按请求头区分缓存时使用private缓存并设置Vary"""
+
+        @cache(expire=30, key_prefix="model:list:", vary_on_headers=["Authorization"])
+        async def endpoint(request: Request):
+            return Response(content=b"data")
+
+        with patch.object(cache_module, "cache_manager", CacheManager()):
+            response = await endpoint(_make_request("/models"))
+
+        assert response.headers["cache-control"] == "private, max-age=30"
+        assert response.headers["vary"] == "authorization"
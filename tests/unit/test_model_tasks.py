@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模型任务测试模块
+
+测试模型部署、验证任务失败时由任务基类记录失败状态。
+"""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app.models.task import TaskStatus
+from app.tasks.common_tasks import SQLAlchemyTask
+from app.tasks.model_tasks import deploy_model, validate_model
+
+
+@pytest.mark.parametrize("task", [deploy_model, validate_model])
+def test_missing_model_marks_task_failed(task):
+    """测试模型不存在时任务以失败结束，且不会被成功状态覆盖"""
+    task_id = str(uuid.uuid4())
+
+    with patch(
+        "app.tasks.model_tasks._run_on_background_loop",
+        side_effect=ValueError("模型不存在"),
+    ), patch.object(SQLAlchemyTask, "_update_db_task_status") as mock_update:
+        result = task.apply(kwargs={"model_id": "missing", "task_id": task_id})
+
+    assert result.state == "FAILURE"
+    statuses = [call.args[1] for call in mock_update.call_args_list]
+    assert statuses[-1] == TaskStatus.FAILED
+    assert statuses.count(TaskStatus.FAILED) == 1
+    assert TaskStatus.SUCCEEDED not in statuses
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+通知任务测试模块
+
+测试批量发送通知任务和批量投递辅助函数。
+"""
+
+from unittest.mock import patch
+
+from app.tasks.common_tasks import enqueue_notifications, send_notifications_bulk
+
+
+@patch("app.tasks.common_tasks.time.sleep", return_value=None)
+@patch("app.tasks.common_tasks.logger")
+class TestNotifications:
+    """通知任务测试类"""
+
+    def test_send_notifications_bulk(self, mock_logger, mock_sleep):
+        """测试批量发送通知，单条失败不影响其余通知"""
+        payloads = [
+            {"user_id": "u1", "message": "m1"},
+            {"user_id": "u2", "message": "m2", "notification_type": "warning"},
+            {"user_id": "u3"},  # 缺少message参数
+        ]
+
+        result = send_notifications_bulk(payloads)
+
+        assert result["total"] == 3
+        assert result["failed"] == 1
+        assert result["success"] is False
+        assert [r["user_id"] for r in result["results"]] == ["u1", "u2", "u3"]
+        assert result["results"][1]["type"] == "warning"
+        assert result["results"][2]["success"] is False
+
+    @patch("app.tasks.common_tasks.group")
+    def test_enqueue_notifications(self, mock_group, mock_logger, mock_sleep):
+        """测试批量投递通知时只发布一次组任务"""
+        payloads = [{"user_id": f"u{i}", "message": "hello"} for i in range(5)]
+
+        result = enqueue_notifications(payloads, queue="low_priority")
+
+        mock_group.assert_called_once()
+        signatures = list(mock_group.call_args[0][0])
+        assert len(signatures) == 5
+        assert signatures[0].kwargs == {"user_id": "u0", "message": "hello"}
+        mock_group.return_value.apply_async.assert_called_once_with(
+            queue="low_priority"
+        )
+        assert result is mock_group.return_value.apply_async.return_value
+
+    @patch("app.tasks.common_tasks.group")
+    def test_enqueue_notifications_empty(self, mock_group, mock_logger, mock_sleep):
+        """测试空列表不投递任何任务"""
+        assert enqueue_notifications([]) is None
+        mock_group.assert_not_called()
@@ -11,9 +11,11 @@ import uuid
 import time
 import pytest
 import asyncio
+import concurrent.futures
+from contextlib import asynccontextmanager
 from unittest.mock import patch, MagicMock, AsyncMock
 
-from app.tasks.common_tasks import SQLAlchemyTask
+from app.tasks.common_tasks import SQLAlchemyTask, _get_update_queue
 from app.models.task import TaskStatus
 from app.services.task import TaskService
 
@@ -29,21 +31,24 @@ def mock_redis_cache():
 @pytest.fixture
 def mock_task_service():
     """模拟任务服务"""
-    with patch('app.tasks.common_tasks.TaskService') as MockTaskService:
-        mock_service = MockTaskService.return_value
+    with patch('app.tasks.common_tasks.task_service') as mock_service:
         mock_service.update_task_status = AsyncMock()
+        mock_service.bulk_update_task_status = AsyncMock()
         yield mock_service
 
 
 @pytest.fixture
 def mock_async_session():
     """模拟异步数据库会话"""
+    @asynccontextmanager
     async def _mock_async_session():
         mock_session = AsyncMock()
         yield mock_session
     
     with patch('app.tasks.common_tasks.async_session', _mock_async_session):
         yield
+        # 等待写入线程处理完队列中的更新，避免影响其他测试
+        _get_update_queue().join()
 
 
 class TestSQLAlchemyTask:
@@ -79,25 +84,27 @@ class TestSQLAlchemyTask:
             error=error
         )
         
-        # 验证缓存更新调用
-        mock_redis_cache.cache_task_status.assert_called_once()
-        args, kwargs = mock_redis_cache.cache_task_status.call_args
-        assert args[0] == task_id
-        assert args[1]["status"] == status.value
-        assert args[1]["progress"] == progress
-        assert args[1]["result"] == result
+        # 缓存和数据库更新由写入线程异步执行，等待队列处理完成
+        _get_update_queue().join()
         
-        # 由于异步更新是在一个新的事件循环中执行的，我们需要给它一点时间完成
-        time.sleep(0.1)
+        # 验证缓存由写入线程批量写入
+        mock_redis_cache.cache_task_status.assert_not_called()
+        mock_redis_cache.cache_task_status_bulk.assert_called_once()
+        args, kwargs = mock_redis_cache.cache_task_status_bulk.call_args
+        cached = args[0][task_id]
+        assert cached["status"] == status.value
+        assert cached["progress"] == progress
+        assert cached["result"] == result
         
-        # 验证任务服务的update_task_status是否被正确调用
-        mock_task_service.update_task_status.assert_awaited_once()
-        args, kwargs = mock_task_service.update_task_status.await_args
-        assert kwargs["task_id"] == uuid.UUID(task_id)
-        assert kwargs["status"] == status
-        assert kwargs["progress"] == progress
-        assert kwargs["result"] == result
-        assert kwargs["error"] == error
+        # 验证任务服务的批量更新是否被正确调用
+        mock_task_service.bulk_update_task_status.assert_awaited_once()
+        args, kwargs = mock_task_service.bulk_update_task_status.await_args
+        update = args[1][0]
+        assert update["task_id"] == task_id
+        assert update["status"] == status
+        assert update["progress"] == progress
+        assert update["result"] == result
+        assert update["error"] == error
     
     def test_update_db_task_status_with_enum_status(self, mock_redis_cache, mock_task_service, mock_async_session):
         """测试使用枚举状态更新任务状态"""
@@ -110,10 +117,11 @@ class TestSQLAlchemyTask:
             task_id=task_id,
             status=status
         )
+        _get_update_queue().join()
         
         # 验证缓存更新调用
-        args, kwargs = mock_redis_cache.cache_task_status.call_args
-        assert args[1]["status"] == status.value
+        args, kwargs = mock_redis_cache.cache_task_status_bulk.call_args
+        assert args[0][task_id]["status"] == status.value
     
     def test_update_db_task_status_with_string_status(self, mock_redis_cache, mock_task_service, mock_async_session):
         """测试使用字符串状态更新任务状态"""
@@ -126,10 +134,11 @@ class TestSQLAlchemyTask:
             task_id=task_id,
             status=status
         )
+        _get_update_queue().join()
         
         # 验证缓存更新调用
-        args, kwargs = mock_redis_cache.cache_task_status.call_args
-        assert args[1]["status"] == status
+        args, kwargs = mock_redis_cache.cache_task_status_bulk.call_args
+        assert args[0][task_id]["status"] == status
     
     def test_update_db_task_status_with_error(self, mock_redis_cache, mock_task_service, mock_async_session):
         """测试带错误信息的任务状态更新"""
@@ -144,21 +153,23 @@ class TestSQLAlchemyTask:
             status=status,
             error=error
         )
+        _get_update_queue().join()
         
         # 验证缓存更新调用
-        args, kwargs = mock_redis_cache.cache_task_status.call_args
-        assert args[1]["status"] == status.value
-        assert args[1]["error"] == error
+        args, kwargs = mock_redis_cache.cache_task_status_bulk.call_args
+        assert args[0][task_id]["status"] == status.value
+        assert args[0][task_id]["error"] == error
     
     @patch('app.tasks.common_tasks.logger')
-    def test_update_db_task_status_exception(self, mock_logger, mock_redis_cache):
+    @patch('app.tasks.common_tasks._submit_status_update')
+    def test_update_db_task_status_exception(self, mock_submit, mock_logger):
         """测试状态更新异常处理"""
         task = SQLAlchemyTask()
         task_id = str(uuid.uuid4())
         status = TaskStatus.RUNNING
         
-        # 模拟缓存更新异常
-        mock_redis_cache.cache_task_status.side_effect = Exception("测试异常")
+        # 模拟提交状态更新异常
+        mock_submit.side_effect = Exception("测试异常")
         
         # 调用更新方法（不应该抛出异常）
         task._update_db_task_status(
@@ -169,4 +180,211 @@ class TestSQLAlchemyTask:
         # 验证异常被记录
         mock_logger.error.assert_called_once()
         args, kwargs = mock_logger.error.call_args
-        assert "更新任务状态失败" in args[0] 
\ No newline at end of file
+        assert "更新任务状态失败" in args[0] 
+
+    def test_update_db_task_status_reuses_background_loop(self, mock_redis_cache, mock_task_service, mock_async_session):
+        """测试多次状态更新复用同一个后台事件循环"""
+        from app.tasks.common_tasks import _get_background_loop
+
+        task = SQLAlchemyTask()
+        task_id = str(uuid.uuid4())
+
+        task._update_db_task_status(task_id=task_id, status=TaskStatus.RUNNING, progress=10)
+        loop = _get_background_loop()
+        task._update_db_task_status(task_id=task_id, status=TaskStatus.RUNNING, progress=20)
+
+        # 验证事件循环在后台线程中持续运行且被复用
+        assert _get_background_loop() is loop
+        assert loop.is_running()
+
+        _get_update_queue().join()
+        updates = [
+            update
+            for call_args in mock_task_service.bulk_update_task_status.await_args_list
+            for update in call_args.args[1]
+        ]
+        assert [u["progress"] for u in updates] == [10, 20]
+
+    @pytest.mark.parametrize("succeeded", [True, False])
+    def test_terminal_status_cached_last(self, succeeded, mock_redis_cache, mock_task_service, mock_async_session):
+        """测试任务结束后缓存中为终止状态，而不是之前刷新的进度"""
+        cache = {}
+
+        def hset_bulk(items):
+            for cached_task_id, status in items.items():
+                cache.setdefault(cached_task_id, {}).update(status)
+            return True
+
+        mock_redis_cache.cache_task_status_bulk.side_effect = hset_bulk
+
+        task = SQLAlchemyTask()
+        task_id = str(uuid.uuid4())
+        kwargs = {"task_id": task_id}
+        task.before_start("celery-id", (), kwargs)
+        task.update_progress(task_id, 95)
+
+        if succeeded:
+            task.on_success({"result": "ok"}, "celery-id", (), kwargs)
+        else:
+            task.on_failure(ValueError("失败"), "celery-id", (), kwargs, None)
+        _get_update_queue().join()
+
+        expected = TaskStatus.SUCCEEDED if succeeded else TaskStatus.FAILED
+        assert cache[task_id]["status"] == expected.value
+
+        # 错误信息以字符串写入数据库的Text列
+        if not succeeded:
+            updates = [
+                update
+                for call_args in mock_task_service.bulk_update_task_status.await_args_list
+                for update in call_args.args[1]
+            ]
+            assert isinstance(updates[-1]["error"], str)
+
+    @staticmethod
+    def _make_update(error=None):
+        return {
+            "task_id": str(uuid.uuid4()),
+            "status": TaskStatus.FAILED,
+            "progress": None,
+            "result": None,
+            "error": error,
+            "updated_at": time.time(),
+        }
+
+    def test_write_status_batch_falls_back_to_single_rows(self, mock_redis_cache, mock_task_service, mock_async_session):
+        """测试批量更新失败时逐条重试，一条错误数据不影响其他更新"""
+        from app.tasks.common_tasks import _write_status_batch
+
+        async def bulk_update(session, updates):
+            if any(update["error"] == "坏数据" for update in updates):
+                raise ValueError("写入失败")
+
+        mock_task_service.bulk_update_task_status.side_effect = bulk_update
+        good, bad = concurrent.futures.Future(), concurrent.futures.Future()
+
+        _write_status_batch([
+            (self._make_update(), True, good),
+            (self._make_update("坏数据"), True, bad),
+        ])
+
+        # 一次批量更新加两次逐条更新
+        assert mock_task_service.bulk_update_task_status.await_count == 3
+        assert good.result(0) is None
+        with pytest.raises(ValueError):
+            bad.result(0)
+
+    def test_write_status_batch_resolves_futures_on_error(self, mock_redis_cache, mock_task_service, mock_async_session):
+        """测试写入前出现异常时仍设置全部Future的结果"""
+        from app.tasks.common_tasks import _write_status_batch
+
+        mock_redis_cache.cache_task_status_bulk.side_effect = RuntimeError("缓存异常")
+        future = concurrent.futures.Future()
+
+        with pytest.raises(RuntimeError):
+            _write_status_batch([(self._make_update(), True, future)])
+
+        with pytest.raises(RuntimeError):
+            future.result(0)
+
+    def test_update_progress_coalesces_updates(self, mock_redis_cache, mock_task_service, mock_async_session):
+        """测试多次进度更新被合并为一次缓存和数据库写入"""
+        from app.tasks.common_tasks import _PENDING_STATUS, _flush_pending_status
+
+        task = SQLAlchemyTask()
+        task_id = str(uuid.uuid4())
+        for progress in (10, 20, 30):
+            assert task.update_progress(task_id, progress, {"step": progress}) is True
+
+        # 只保留最新一次进度
+        assert _PENDING_STATUS[task_id]["progress"] == 30
+
+        _flush_pending_status(task_id)
+        assert task_id not in _PENDING_STATUS
+        _get_update_queue().join()
+
+        # 验证缓存只批量写入一次，且为最新进度
+        mock_redis_cache.cache_task_status.assert_not_called()
+        mock_redis_cache.cache_task_status_bulk.assert_called_once()
+        args, kwargs = mock_redis_cache.cache_task_status_bulk.call_args
+        assert list(args[0]) == [task_id]
+        assert args[0][task_id]["progress"] == 30
+        assert args[0][task_id]["result"]["step"] == 30
+
+        # 验证数据库只进行一次批量更新
+        mock_task_service.bulk_update_task_status.assert_awaited_once()
+        args, kwargs = mock_task_service.bulk_update_task_status.await_args
+        assert [u["progress"] for u in args[1]] == [30]
+
+    def test_status_queue_backpressure(self, mock_redis_cache, mock_task_service, mock_async_session):
+        """测试状态更新队列已满时丢弃进度更新、阻塞终止状态更新"""
+        import queue
+        import threading
+        from app.tasks import common_tasks
+
+        full_queue = queue.Queue(maxsize=1)
+        full_queue.put(("占位", False, None))
+        task_id = str(uuid.uuid4())
+
+        with patch.object(common_tasks, '_get_update_queue', return_value=full_queue), \
+                patch.object(common_tasks, '_UPDATE_PUT_TIMEOUT', 0.01), \
+                patch.object(common_tasks, 'logger') as mock_logger:
+            # 非终止状态：等待超时后被丢弃
+            future = common_tasks._submit_status_update(task_id, TaskStatus.RUNNING, progress=50)
+            assert future.cancelled()
+            mock_logger.warning.assert_called_once()
+
+            # 终止状态：阻塞直到队列腾出空位
+            thread = threading.Thread(
+                target=common_tasks._submit_status_update,
+                args=(task_id, TaskStatus.SUCCEEDED, 100),
+            )
+            thread.start()
+            thread.join(0.05)
+            assert thread.is_alive()
+
+            full_queue.get_nowait()
+            thread.join(1)
+            assert not thread.is_alive()
+            update, cache, _ = full_queue.get_nowait()
+            assert update["status"] == TaskStatus.SUCCEEDED
+
+    def test_update_status_sync(self, mock_redis_cache, mock_task_service):
+        """测试同步更新任务状态直接写库并刷新缓存"""
+        from app.tasks.common_tasks import _update_status_sync
+
+        task_id = str(uuid.uuid4())
+        mock_task_service.update_task_status_sync = MagicMock(return_value=True)
+
+        with patch('app.tasks.common_tasks.SessionLocal') as mock_session_local:
+            assert _update_status_sync(task_id, TaskStatus.SUCCEEDED, progress=100) is True
+
+        # 验证使用连接池会话同步写库，不经过后台事件循环
+        db = mock_session_local.return_value.__enter__.return_value
+        mock_task_service.update_task_status_sync.assert_called_once_with(
+            db, task_id, TaskStatus.SUCCEEDED, progress=100, result=None, error=None
+        )
+        mock_task_service.bulk_update_task_status.assert_not_awaited()
+
+        args, kwargs = mock_redis_cache.cache_task_status.call_args
+        assert args[0] == task_id
+        assert args[1]["status"] == TaskStatus.SUCCEEDED.value
+        assert args[1]["progress"] == 100
+
+    def test_build_status_update_order(self):
+        """测试批量更新参数按任务ID排序，同一任务的更新保持原顺序"""
+        updates = [
+            {"task_id": "b", "status": TaskStatus.RUNNING, "progress": 10},
+            {"task_id": "a", "status": TaskStatus.RUNNING},
+            {"task_id": "b", "status": TaskStatus.SUCCEEDED, "progress": 100},
+        ]
+
+        _, params = TaskService._build_status_update(updates)
+
+        assert [(p["b_id"], p["b_status"]) for p in params] == [
+            ("a", TaskStatus.RUNNING),
+            ("b", TaskStatus.RUNNING),
+            ("b", TaskStatus.SUCCEEDED),
+        ]
+        assert params[1]["b_started_at"] is not None
+        assert params[2]["b_completed_at"] is not None